@@ -1,11 +1,17 @@
-from process_generator import generateProcess
+import json
+import time
+
+from metrics import LatencyStats
+from process_generator import generateProcess, generateProcesses
+from scheduler import DEFAULT_MACHINE, Scheduler
 
 
 k = 250  ## total number of processes on the system
 
 
 # ----------------------------------------------------------------------------
-#    loadProcesses - helper function that loads newly generated processes into a list
+#    loadProcesses - helper function that loads newly generated processes into a list. The
+#                    processes are generated in one batch by generateProcesses.
 #
 #
 #    @returns - temp : list         -list of newly generated processes
@@ -13,17 +19,14 @@ k = 250  ## total number of processes on the system
 
 
 def loadProcesses():
-    temp = []
-    count = k
-    while count > 0:
-        temp.append(generateProcess())
-        count = count - 1
-    return temp
+    return generateProcesses(k).toProcesses()
 
 
 # ----------------------------------------------------------------------------
 #    benchmarkAlgorthm - measures turnaround and wait times for custom priority scheduling algorthm in nanoseconds.
-#                    print average value to the screen when complete
+#                    print average and 99th percentile values to the screen when complete. Wait time is
+#                    the time a process spent in the process queue before it first started executing.
+#                    Times are summarized online by LatencyStats, so memory doesn't grow with k.
 #
 #
 #    @returns - scheduler : Scheduler         -Scheduler to simulate scheduling method
@@ -33,58 +36,312 @@ def loadProcesses():
 def benchmarkQuestionFourAlgorithm(scheduler):
     count = k
 
-    turnaroundTimeSum = 0
-    waitTimeSum = 0
+    turnaroundTimes = LatencyStats()
+    waitTimes = LatencyStats()
+
+    submitted = {}  ## clock at which each process was handed to the scheduler
 
     while count > 0:
-        scheduler.attachProcess(generateProcess())
+        newProcess = generateProcess()
+        submitted[id(newProcess)] = scheduler.clock
+        scheduler.attachProcess(newProcess)
         endedProcess = scheduler.detachProcess()
         if endedProcess == None:
             break
 
-        turnaroundTime = endedProcess.completion_time - endedProcess.arrival_time
-        waitTime = turnaroundTime - endedProcess.burst_time
-
-        turnaroundTimeSum = turnaroundTimeSum + turnaroundTime
-        waitTimeSum = waitTimeSum + waitTime
+        turnaroundTimes.add(endedProcess.completion_time - endedProcess.arrival_time)
+        waitTimes.add(
+            endedProcess.arrival_time
+            - submitted.pop(id(endedProcess), endedProcess.arrival_time)
+        )
 
         count = count - 1
 
+    turnaround = turnaroundTimes.summary()
+    wait = waitTimes.summary()
+
     print(
         "----------------------Benchmarking Question 4 Algorithm-----------------------------\n"
     )
-    print("Average turnaround: %f nanoseconds\n" % ((turnaroundTimeSum / k) * 1e9))
+    print("Average turnaround: %f nanoseconds\n" % (turnaround.get("mean", 0) * 1e9))
+    print(
+        "99th percentile turnaround: %f nanoseconds\n"
+        % (turnaround.get("p99", 0) * 1e9)
+    )
+    print("Average wait: %f nanoseconds\n" % (wait.get("mean", 0) * 1e9))
+    print("99th percentile wait: %f nanoseconds\n" % (wait.get("p99", 0) * 1e9))
 
 
 # ----------------------------------------------------------------------------
-#    sortProcesses - variation of QuickSort thats sorts processes by burst time. Used
-#                    to sort processes before being scheduled
+#    simulateWorkload - runs one workload through a new scheduler the same way as
+#                       benchmarkQuestionFourAlgorithm, attaching a process before each
+#                       detach, then detaches until every process has completed. Without a
+#                       process interval the tail is completed by Scheduler.fastForward.
 #
 #
-#    @returns - scheduler : Scheduler         -Scheduler to simulate scheduling method
+#    @params:  processes : list           - processes to simulate
+#
+#              process_interval : int     - process interval of the scheduler
+#
+#              machine : list             - list of Processor describing the system
+#
+#    @returns - events : int              - number of processes detached, including those
+#                                           pushed back to the process queue
+#
+#               wallTime : float          - seconds spent in attachProcess/detachProcess
+#
+#               turnaroundTimes : list    - turnaround time of every process
+#
+#               waitTimes : list          - wait time of every process
 # ----------------------------------------------------------------------------
 
 
-def sortProcesses(processes, first, last):
-    if len(processes) == 1:
-        return processes
-    if first < last:
+def simulateWorkload(processes, process_interval, machine):
+    scheduler = Scheduler(process_interval, machine=machine)
+    events = 0
+    submitted = []
+
+    start = time.perf_counter()
+    for process in processes:
+        submitted.append(scheduler.clock)
+        scheduler.attachProcess(process)
+        if scheduler.detachProcess() != None:
+            events = events + 1
+    if process_interval == 0:
+        events = events + len(scheduler.fastForward())
+    else:
+        while scheduler.detachProcess() != None:
+            events = events + 1
+    wallTime = time.perf_counter() - start
+
+    turnaroundTimes = [
+        process.completion_time - process.arrival_time for process in processes
+    ]
+    waitTimes = [
+        process.arrival_time - submittedClock
+        for submittedClock, process in zip(submitted, processes)
+    ]
+    return events, wallTime, turnaroundTimes, waitTimes
+
+
+# ----------------------------------------------------------------------------
+#    benchmarkSuite - benchmarks the scheduler on fixed workloads. Each seed gets warm-up
+#                     runs that aren't measured, then several timed repetitions. Turnaround
+#                     and wait times only depend on the workload, so they're taken from the
+#                     first repetition of each seed and pooled.
+#
+#
+#    @params:  process_interval : int     - process interval of the scheduler. defaults to zero.
+#
+#              machine : list             - list of Processor describing the system.
+#                                           defaults to DEFAULT_MACHINE.
+#
+#              processes : int            - number of processes per workload. defaults to k.
+#
+#              seeds : list               - workload seeds. defaults to (0, 1, 2).
+#
+#              warmups : int              - unmeasured runs per seed. defaults to 1.
+#
+#              repetitions : int          - measured runs per seed. defaults to 5.
+#
+#    @returns - report : dict             - configuration, turnaround and wait percentiles and
+#                                           simulator throughput. Can be saved with saveReport.
+# ----------------------------------------------------------------------------
+
+
+def benchmarkSuite(
+    process_interval=0,
+    machine=DEFAULT_MACHINE,
+    processes=k,
+    seeds=(0, 1, 2),
+    warmups=1,
+    repetitions=5,
+):
+    turnaroundTimes = []
+    waitTimes = []
+    runs = []
+    for seed in seeds:
+        workload = generateProcesses(processes, seed=seed)
+        for repetition in range(warmups + repetitions):
+            events, wallTime, turnarounds, waits = simulateWorkload(
+                workload.toProcesses(), process_interval, machine
+            )
+            if repetition < warmups:
+                continue
+            if repetition == warmups:
+                turnaroundTimes.extend(turnarounds)
+                waitTimes.extend(waits)
+            runs.append(
+                {
+                    "seed": seed,
+                    "repetition": repetition - warmups,
+                    "events": events,
+                    "wall_time": wallTime,
+                    "events_per_second": events / wallTime if wallTime else 0,
+                }
+            )
+
+    return {
+        "config": {
+            "process_interval": process_interval,
+            "machine": [
+                {"clock_speed": processor.clock_speed, "memory": processor.memory}
+                for processor in machine
+            ],
+            "processes": processes,
+            "seeds": list(seeds),
+            "warmups": warmups,
+            "repetitions": repetitions,
+        },
+        "turnaround_time": summarizeTimes(turnaroundTimes),
+        "wait_time": summarizeTimes(waitTimes),
+        "wall_time": summarizeTimes([run["wall_time"] for run in runs]),
+        "events_per_second": summarizeTimes([run["events_per_second"] for run in runs]),
+        "runs": runs,
+    }
+
+
+# ----------------------------------------------------------------------------
+#    benchmarkPolicies - runs the same workload through each scheduling policy of the
+#                        PolicyScheduler and reports them side by side. Every process is
+#                        submitted at time zero, so its turnaround time is its completion
+#                        time, including the time it waited.
+#
+#
+#    @params:  policies : dict            - policy factories by name. defaults to every
+#                                           policy in policies.POLICIES.
+#
+#              machine : list             - list of Processor describing the system.
+#                                           defaults to DEFAULT_MACHINE.
+#
+#              processes : int            - number of processes in the workload. defaults to k.
+#
+#              seed : int                 - workload seed. defaults to zero.
+#
+#    @returns - report : dict             - turnaround and wait times, events processed and
+#                                           events per second, by policy name
+# ----------------------------------------------------------------------------
+
+
+def benchmarkPolicies(policies=None, machine=DEFAULT_MACHINE, processes=k, seed=0):
+    from policies import POLICIES, PolicyScheduler
 
-        i = first - 1
-        pivot = processes[last].burst_time
+    if policies == None:
+        policies = POLICIES
+    workload = generateProcesses(processes, seed=seed)
 
-        for j in range(first, last):
-            if processes[j].burst_time <= pivot:
+    report = {}
+    for name, makePolicy in policies.items():
+        jobs = workload.toProcesses()
+        start = time.perf_counter()
+        scheduler = PolicyScheduler(makePolicy(), jobs, machine)
+        while scheduler.detachProcess() != None:
+            pass
+        wallTime = time.perf_counter() - start
 
-                i = i + 1
-                processes[i], processes[j] = processes[j], processes[i]
+        report[name] = {
+            "turnaround_time": summarizeTimes([job.completion_time for job in jobs]),
+            "wait_time": summarizeTimes([job.arrival_time for job in jobs]),
+            "events": scheduler.event_count,
+            "events_per_second": scheduler.event_count / wallTime if wallTime else 0,
+        }
+    return report
 
-        processes[i + 1], processes[last] = (
-            processes[last],
-            processes[i + 1],
+
+# ----------------------------------------------------------------------------
+#    summarizeTimes - helper function that returns the mean, median, 95th and 99th
+#                     percentiles and maximum of a list of times
+#
+#
+#    @params:  values : list              - times to summarize
+#
+#    @returns - summary : dict            - empty if there are no values
+# ----------------------------------------------------------------------------
+
+
+def summarizeTimes(values):
+    import numpy as np
+
+    values = np.asarray(values, dtype=np.float64)
+    if len(values) == 0:
+        return {}
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "mean": float(values.mean()),
+        "p50": float(p50),
+        "p95": float(p95),
+        "p99": float(p99),
+        "max": float(values.max()),
+    }
+
+
+# ----------------------------------------------------------------------------
+#    saveReport - writes a benchmark report as JSON so runs can be compared across releases
+#
+#
+#    @params:  report : dict              - report returned by benchmarkSuite
+#
+#              path : str                 - file to write
+# ----------------------------------------------------------------------------
+
+
+def saveReport(report, path):
+    with open(path, "w") as file:
+        json.dump(report, file, indent=2)
+
+
+# ----------------------------------------------------------------------------
+#    sortProcesses - sorts processes by burst time in place. Used to sort processes before
+#                    being scheduled shortest job first by "cli.py simulate --shortest-first".
+#                    Uses Python's stable sort, so it's O(n log n) on any input, keeps
+#                    processes with the same burst time in order and doesn't recurse.
+#
+#
+#    @params:  processes : list           - processes to sort
+#
+#              first : int                - index of the first process to sort. defaults to 0.
+#
+#              last : int                 - index of the last process to sort. defaults to
+#                                           the end of the list.
+#
+#    @returns - processes : list          - the same list, sorted
+# ----------------------------------------------------------------------------
+
+
+def sortProcesses(processes, first=0, last=None):
+    if last == None:
+        last = len(processes) - 1
+    if first < last:
+        processes[first : last + 1] = sorted(
+            processes[first : last + 1], key=burstTimeKey
         )
+    return processes
+
+
+# ----------------------------------------------------------------------------
+#    sortWorkload - columnar counterpart of sortProcesses. Sorts a Workload by burst time
+#                   with a stable NumPy argsort. Used for "--batch --shortest-first" runs.
+#
+#
+#    @params:  workload : Workload        - processes to sort. Not modified.
+#
+#    @returns - workload : Workload       - new workload, sorted
+# ----------------------------------------------------------------------------
+
+
+def sortWorkload(workload):
+    return workload.take(workload.burst_time.argsort(kind="stable"))
+
+
+# ----------------------------------------------------------------------------
+#    burstTimeKey - helper function that returns the sort key of a process, its burst time
+#
+#
+#    @params:  process : Process          - process to sort
+#
+#    @returns - burst time of the process : int
+# ----------------------------------------------------------------------------
 
-        pi = i + 1
 
-        sortProcesses(processes, first, pi - 1)
-        sortProcesses(processes, pi + 1, last)
+def burstTimeKey(process):
+    return process.burst_time
@@ -0,0 +1,330 @@
+from collections import OrderedDict
+import hashlib
+import json
+import os
+import tempfile
+
+import numpy as np
+
+from batch_engine import Workload, simulate
+
+
+CACHE_VERSION = 4  ## part of every key, bump it when simulation results change
+RESULT_COLUMNS = (
+    "PID",
+    "burst_time",
+    "memory_footprint",
+    "remaining_cycles",
+    "arrival_time",
+    "completion_time",
+)
+
+openCaches = {}  ## ResultCache of each directory opened by openCache in this process
+
+
+# ----------------------------------------------------------------------------
+#    resultKey - content address of a simulation: a hash of every column of the workload
+#                together with the configuration it's simulated with. Equal workloads
+#                simulated the same way get the same key, wherever they came from.
+#
+#
+#    @params:  workload : Workload          - workload to simulate
+#
+#              machine : list               - list of Processor describing the system
+#
+#              process_interval : int       - process interval of the simulation
+#
+#              clock : float                - clock the simulation starts at
+#
+#              placement : str              - processor placement policy
+#
+#              policy : str                 - name of the scheduling policy. defaults to the
+#                                             first come first served ReadyQueue.
+#
+#    @returns - key : str                   - sha256 hex digest
+# ----------------------------------------------------------------------------
+
+
+def resultKey(
+    workload, machine, process_interval=0, clock=0, placement="first", policy="fcfs"
+):
+    digest = hashlib.sha256()
+    config = [
+        CACHE_VERSION,
+        policy,
+        placement,
+        float(process_interval),
+        float(clock),
+        [
+            [float(processor.clock_speed), int(processor.memory)]
+            for processor in machine
+        ],
+        len(workload),
+    ]
+    digest.update(json.dumps(config).encode("utf-8"))
+    for column in RESULT_COLUMNS:
+        digest.update(np.ascontiguousarray(getattr(workload, column)).data)
+    return digest.hexdigest()
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    ResultCache - two tier cache of simulation results by resultKey. The memory tier keeps
+#                  the most recently used results. The disk tier keeps one .npz file per
+#                  result in a directory, and evicts the least recently used files once
+#                  they take more than disk_bytes. Recency on disk is the file's mtime, so
+#                  several processes can share one directory, e.g. the workers of a sweep.
+#
+#                  A result is the finished workload and the clock the simulation ended at.
+#                  Callers get their own copy of the workload on every lookup.
+#
+#
+#    @fields:   directory : str             - directory of the disk tier, "None" for memory only.
+#
+#               memory_entries : int        - most results held in memory.
+#
+#               disk_bytes : int            - most bytes of results held on disk.
+#
+#               entries : OrderedDict       - results in memory by key, least recently used first.
+#
+#               hits : int                  - lookups answered from memory.
+#
+#               disk_hits : int             - lookups answered from disk.
+#
+#               misses : int                - lookups that found nothing.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class ResultCache:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   directory : str          - directory of the disk tier, created if missing.
+    #                                          defaults to no disk tier.
+    #
+    #               memory_entries : int     - most results held in memory. defaults to 64.
+    #
+    #               disk_bytes : int         - most bytes held on disk. defaults to 1 GiB.
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, directory=None, memory_entries=64, disk_bytes=1 << 30):
+        self.directory = directory
+        self.memory_entries = memory_entries
+        self.disk_bytes = disk_bytes
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory != None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self):
+        return len(self.entries)
+
+    # ----------------------------------------------------------------------------
+    #    get - function that looks a result up, memory first. A result found on disk is
+    #          kept in memory too.
+    #
+    #
+    #    @params:       key : str               - key from resultKey
+    #
+    #    @returns:      result : tuple          - (workload, clock), "None" if it isn't cached
+    #
+    # ----------------------------------------------------------------------------
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry != None:
+            self.entries.move_to_end(key)
+            self.hits = self.hits + 1
+        else:
+            entry = self.readEntry(key)
+            if entry == None:
+                self.misses = self.misses + 1
+                return None
+            self.disk_hits = self.disk_hits + 1
+            self.remember(key, entry)
+        columns, clock = entry
+        return Workload(*(column.copy() for column in columns)), clock
+
+    # ----------------------------------------------------------------------------
+    #    put - function that saves a result in both tiers
+    #
+    #
+    #    @params:       key : str               - key from resultKey
+    #
+    #                   workload : Workload     - finished workload. Copied.
+    #
+    #                   clock : float           - clock the simulation ended at
+    #
+    # ----------------------------------------------------------------------------
+
+    def put(self, key, workload, clock):
+        entry = (
+            tuple(getattr(workload, column).copy() for column in RESULT_COLUMNS),
+            clock,
+        )
+        self.remember(key, entry)
+        self.writeEntry(key, entry)
+
+    # ----------------------------------------------------------------------------
+    #    simulate - memoized batch_engine.simulate. Takes and returns the same as it.
+    # ----------------------------------------------------------------------------
+
+    def simulate(
+        self, workload, machine, process_interval=0, clock=0, placement="first"
+    ):
+        key = resultKey(workload, machine, process_interval, clock, placement)
+        cached = self.get(key)
+        if cached != None:
+            return cached
+        result, clock = simulate(workload, machine, process_interval, clock, placement)
+        self.put(key, result, clock)
+        return result, clock
+
+    # ----------------------------------------------------------------------------
+    #    clear - function that empties both tiers
+    # ----------------------------------------------------------------------------
+
+    def clear(self):
+        self.entries.clear()
+        for path, size, mtime in self.diskEntries():
+            removeFile(path)
+
+    # ----------------------------------------------------------------------------
+    #    remember - helper function that adds a result to the memory tier, evicting the
+    #               least recently used one if it's full
+    # ----------------------------------------------------------------------------
+
+    def remember(self, key, entry):
+        if self.memory_entries <= 0:
+            return
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.memory_entries:
+            self.entries.popitem(last=False)
+
+    # ----------------------------------------------------------------------------
+    #    path - helper function that returns the disk tier file of a key
+    # ----------------------------------------------------------------------------
+
+    def path(self, key):
+        return os.path.join(self.directory, key + ".npz")
+
+    # ----------------------------------------------------------------------------
+    #    readEntry - helper function that loads a result from the disk tier and marks it as
+    #                recently used
+    #
+    #
+    #    @params:       key : str               - key from resultKey
+    #
+    #    @returns:      entry : tuple           - (columns, clock), "None" if it isn't on disk
+    #
+    # ----------------------------------------------------------------------------
+
+    def readEntry(self, key):
+        if self.directory == None:
+            return None
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                columns = tuple(data[column] for column in RESULT_COLUMNS)
+                clock = float(data["clock"])
+            os.utime(path)
+        except (OSError, KeyError, ValueError):
+            return None  ## missing, evicted by another process or unreadable
+        return columns, clock
+
+    # ----------------------------------------------------------------------------
+    #    writeEntry - helper function that saves a result to the disk tier, then evicts the
+    #                 least recently used files until the tier fits in disk_bytes. The file
+    #                 is written under a temporary name and renamed, so readers never see
+    #                 half of one.
+    # ----------------------------------------------------------------------------
+
+    def writeEntry(self, key, entry):
+        if self.directory == None:
+            return
+        columns, clock = entry
+        if sum(column.nbytes for column in columns) > self.disk_bytes:
+            return
+        file = tempfile.NamedTemporaryFile(
+            dir=self.directory, suffix=".tmp", delete=False
+        )
+        try:
+            with file:
+                np.savez(file, clock=clock, **dict(zip(RESULT_COLUMNS, columns)))
+            os.replace(file.name, self.path(key))
+        except OSError:
+            removeFile(file.name)
+            raise
+        self.evict()
+
+    # ----------------------------------------------------------------------------
+    #    evict - helper function that removes the least recently used files of the disk tier
+    #            until the rest fit in disk_bytes
+    # ----------------------------------------------------------------------------
+
+    def evict(self):
+        entries = self.diskEntries()
+        total = sum(size for path, size, mtime in entries)
+        entries.sort(key=lambda entry: entry[2])
+        for path, size, mtime in entries:
+            if total <= self.disk_bytes:
+                break
+            removeFile(path)
+            total = total - size
+
+    # ----------------------------------------------------------------------------
+    #    diskEntries - helper function that returns (path, size, mtime) of every result file
+    #                  in the disk tier
+    # ----------------------------------------------------------------------------
+
+    def diskEntries(self):
+        if self.directory == None:
+            return []
+        entries = []
+        with os.scandir(self.directory) as files:
+            for file in files:
+                if not file.name.endswith(".npz"):
+                    continue
+                try:
+                    status = file.stat()
+                except OSError:
+                    continue
+                entries.append((file.path, status.st_size, status.st_mtime))
+        return entries
+
+
+# ----------------------------------------------------------------------------
+#    openCache - returns the ResultCache of a directory, opening it the first time. Later
+#                calls in the same process share its memory tier, so each worker of a
+#                sweep keeps one cache for all of its simulations.
+#
+#
+#    @params:  directory : str              - directory of the disk tier
+#
+#    @returns - cache : ResultCache
+# ----------------------------------------------------------------------------
+
+
+def openCache(directory):
+    directory = os.path.abspath(directory)
+    if directory not in openCaches:
+        openCaches[directory] = ResultCache(directory)
+    return openCaches[directory]
+
+
+# ----------------------------------------------------------------------------
+#    removeFile - helper function that deletes a file another process may already have deleted
+# ----------------------------------------------------------------------------
+
+
+def removeFile(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
@@ -0,0 +1,300 @@
+import heapq
+import itertools
+import struct
+
+import ready_queue
+from ready_queue import PriorityReadyQueue, ReadyQueue
+from scheduler import PLACEMENTS, Process, Processor, Scheduler
+
+
+# ----------------------------------------------------------------------------
+#    Checkpoint format - the full state of a Scheduler as little-endian binary. A
+#                        header, then in order:
+#
+#    priority name : bytes      - __name__ of the PriorityReadyQueue's priority function,
+#                                 priority_length bytes of utf-8. Empty for a ReadyQueue.
+#    processors                 - one PROCESSOR_RECORD per processor: clock speed, memory,
+#                                 expected finish time and start of its run on its class
+#                                 clock, cycles of its coalesced run.
+#    class clocks               - one CLASS_RECORD per clock speed: clock speed, class clock.
+#    running processes          - one RUNNING_RECORD per occupied processor: processor index
+#                                 followed by a PROCESS_RECORD.
+#    queued processes           - one PROCESS_RECORD per process, front of the queue first.
+#    next arrival               - timestamp followed by a PROCESS_RECORD, if HAS_ARRIVAL is set.
+#
+#    PROCESS_RECORD is PID, burst_time, remaining_cycles, memory_footprint, arrival_time and
+#    completion_time.
+# ----------------------------------------------------------------------------
+
+CHECKPOINT_MAGIC = b"SCHEDCKP"
+CHECKPOINT_VERSION = 3
+CHECKPOINT_HEADER = struct.Struct("<8sIIddQQQHBx")
+PROCESSOR_RECORD = struct.Struct("<dqddq")
+CLASS_RECORD = struct.Struct("<dd")
+PROCESS_RECORD = struct.Struct("<qqqqdd")
+RUNNING_RECORD = struct.Struct("<q" + PROCESS_RECORD.format[1:])
+ARRIVAL_RECORD = struct.Struct("<d" + PROCESS_RECORD.format[1:])
+
+##header flags
+PRIORITY_QUEUE = 1
+HAS_ARRIVAL = 2
+
+
+# ----------------------------------------------------------------------------
+#    packProcess - helper function that returns the fields of a PROCESS_RECORD
+# ----------------------------------------------------------------------------
+
+
+def packProcess(process):
+    return (
+        process.PID,
+        int(process.burst_time),
+        int(process.remaining_cycles),
+        process.memory_footprint,
+        process.arrival_time,
+        process.completion_time,
+    )
+
+
+# ----------------------------------------------------------------------------
+#    snapshotScheduler - saves the state of a scheduler: its clock, processors, running and
+#                        queued processes and the next process of its arrival stream. The
+#                        rest of the stream is an iterator and can't be saved. It has to be
+#                        passed back in on restore. Instrumentation isn't saved either.
+#
+#
+#    @params:  scheduler : Scheduler        - scheduler to save. Not modified.
+#
+#    @returns - checkpoint : bytes
+# ----------------------------------------------------------------------------
+
+
+def snapshotScheduler(scheduler):
+    process_queue = scheduler.process_queue
+    flags = 0
+    priorityName = b""
+    if isinstance(process_queue, PriorityReadyQueue):
+        flags = flags | PRIORITY_QUEUE
+        priorityName = process_queue.priority.__name__.encode("utf-8")
+    elif type(process_queue) != ReadyQueue:
+        raise ValueError("can't snapshot a %s" % type(process_queue).__name__)
+    if scheduler.next_arrival != None:
+        flags = flags | HAS_ARRIVAL
+
+    pool = scheduler.pool
+    running = [
+        (index, process)
+        for index, process in enumerate(pool.current_processes)
+        if process != None
+    ]
+    parts = [
+        CHECKPOINT_HEADER.pack(
+            CHECKPOINT_MAGIC,
+            CHECKPOINT_VERSION,
+            flags,
+            scheduler.clock,
+            scheduler.process_interval,
+            len(pool),
+            len(running),
+            len(process_queue),
+            len(priorityName),
+            PLACEMENTS.index(pool.placement),
+        ),
+        priorityName,
+    ]
+    parts.extend(
+        PROCESSOR_RECORD.pack(clock_speed, memory, finish_time, run_start, int(cycles))
+        for clock_speed, memory, finish_time, run_start, cycles in zip(
+            pool.clock_speeds,
+            pool.memory,
+            scheduler.finish_times,
+            scheduler.run_starts,
+            scheduler.run_cycles,
+        )
+    )
+    parts.append(struct.pack("<I", len(scheduler.clock_speeds)))
+    parts.extend(
+        CLASS_RECORD.pack(clock_speed, scheduler.class_clocks[clock_speed])
+        for clock_speed in scheduler.clock_speeds
+    )
+    parts.extend(
+        RUNNING_RECORD.pack(index, *packProcess(process)) for index, process in running
+    )
+    parts.extend(
+        PROCESS_RECORD.pack(*packProcess(process)) for process in process_queue
+    )
+    if scheduler.next_arrival != None:
+        timestamp, process = scheduler.next_arrival
+        parts.append(ARRIVAL_RECORD.pack(timestamp, *packProcess(process)))
+    return b"".join(parts)
+
+
+# ----------------------------------------------------------------------------
+#    restoreScheduler - builds a new scheduler from a checkpoint. Every restore gets its
+#                       own copies of the processes, so several continuations can be forked
+#                       from one checkpoint, each with different settings.
+#
+#
+#    @params:  checkpoint : bytes           - checkpoint from snapshotScheduler
+#
+#              process_interval : int       - process interval to continue with. defaults to
+#                                             the saved one.
+#
+#              process_queue : ReadyQueue   - empty queue to restore the queued processes into.
+#                                             defaults to the saved kind of queue. Needed for a
+#                                             PriorityReadyQueue whose priority function isn't
+#                                             defined in ready_queue.
+#
+#              arrivals : iterable          - rest of the arrival stream, after the saved next
+#                                             arrival
+#
+#    @returns - scheduler : Scheduler
+# ----------------------------------------------------------------------------
+
+
+def restoreScheduler(
+    checkpoint, process_interval=None, process_queue=None, arrivals=None
+):
+    data = memoryview(checkpoint)
+    if len(data) < CHECKPOINT_HEADER.size:
+        raise ValueError("not a scheduler checkpoint")
+    (
+        magic,
+        version,
+        flags,
+        clock,
+        savedInterval,
+        processorCount,
+        runningCount,
+        queuedCount,
+        priorityLength,
+        placement,
+    ) = CHECKPOINT_HEADER.unpack_from(data)
+    if magic != CHECKPOINT_MAGIC:
+        raise ValueError("not a scheduler checkpoint")
+    if version != CHECKPOINT_VERSION:
+        raise ValueError("unsupported checkpoint version %d" % version)
+    offset = CHECKPOINT_HEADER.size
+
+    priorityName = bytes(data[offset : offset + priorityLength]).decode("utf-8")
+    offset = offset + priorityLength
+    if process_queue == None:
+        if flags & PRIORITY_QUEUE:
+            priority = getattr(ready_queue, priorityName, None)
+            if priority == None:
+                raise ValueError(
+                    "pass a process_queue to restore priority function %s"
+                    % priorityName
+                )
+            process_queue = PriorityReadyQueue(priority)
+        else:
+            process_queue = ReadyQueue()
+
+    size = PROCESSOR_RECORD.size * processorCount
+    processors = list(PROCESSOR_RECORD.iter_unpack(data[offset : offset + size]))
+    offset = offset + size
+    (classCount,) = struct.unpack_from("<I", data, offset)
+    offset = offset + 4
+    size = CLASS_RECORD.size * classCount
+    classes = list(CLASS_RECORD.iter_unpack(data[offset : offset + size]))
+    offset = offset + size
+    size = RUNNING_RECORD.size * runningCount
+    running = RUNNING_RECORD.iter_unpack(data[offset : offset + size])
+    offset = offset + size
+    size = PROCESS_RECORD.size * queuedCount
+    queued = PROCESS_RECORD.iter_unpack(data[offset : offset + size])
+    offset = offset + size
+
+    if process_interval == None:
+        process_interval = (
+            int(savedInterval) if savedInterval.is_integer() else savedInterval
+        )
+    scheduler = Scheduler(
+        process_interval,
+        machine=[
+            Processor(clock_speed, memory) for clock_speed, memory, *run in processors
+        ],
+        process_queue=process_queue,
+        placement=PLACEMENTS[placement],
+    )
+    scheduler.clock = clock
+    for clock_speed, class_clock in classes:
+        scheduler.class_clocks[clock_speed] = class_clock
+    for index, *fields in running:
+        scheduler.pool.setProcess(index, Process(*fields))
+        clock_speed = scheduler.pool.clock_speeds[index]
+        scheduler.finish_times[index] = processors[index][2]
+        scheduler.run_starts[index] = processors[index][3]
+        scheduler.run_cycles[index] = processors[index][4]
+        scheduler.versions[index] = scheduler.versions[index] + 1
+        heapq.heappush(
+            scheduler.completion_index[clock_speed],
+            (scheduler.finish_times[index], index, scheduler.versions[index]),
+        )
+    for fields in queued:
+        process_queue.push(Process(*fields))
+
+    if flags & HAS_ARRIVAL:
+        timestamp, *fields = ARRIVAL_RECORD.unpack_from(data, offset)
+        scheduler.streamProcesses(
+            itertools.chain([(timestamp, Process(*fields))], arrivals or ())
+        )
+    elif arrivals != None:
+        scheduler.streamProcesses(arrivals)
+    return scheduler
+
+
+# ----------------------------------------------------------------------------
+#    forkScheduler - returns an independent copy of a scheduler to continue with different
+#                    settings, e.g. another process interval
+#
+#
+#    @params:  scheduler : Scheduler        - scheduler to fork. Not modified.
+#
+#              process_interval : int       - process interval of the fork. defaults to the
+#                                             scheduler's.
+#
+#              arrivals : iterable          - rest of the arrival stream for the fork
+#
+#    @returns - fork : Scheduler
+# ----------------------------------------------------------------------------
+
+
+def forkScheduler(scheduler, process_interval=None, arrivals=None):
+    process_queue = None
+    if isinstance(scheduler.process_queue, PriorityReadyQueue):
+        process_queue = PriorityReadyQueue(scheduler.process_queue.priority)
+    return restoreScheduler(
+        snapshotScheduler(scheduler), process_interval, process_queue, arrivals
+    )
+
+
+# ----------------------------------------------------------------------------
+#    writeCheckpoint - saves the state of a scheduler to a file
+#
+#
+#    @params:  path : str                   - file to create
+#
+#              scheduler : Scheduler        - scheduler to save
+# ----------------------------------------------------------------------------
+
+
+def writeCheckpoint(path, scheduler):
+    with open(path, "wb") as file:
+        file.write(snapshotScheduler(scheduler))
+
+
+# ----------------------------------------------------------------------------
+#    readCheckpoint - restores a scheduler saved by writeCheckpoint. Takes the same
+#                     keyword arguments as restoreScheduler.
+#
+#
+#    @params:  path : str                   - checkpoint file
+#
+#    @returns - scheduler : Scheduler
+# ----------------------------------------------------------------------------
+
+
+def readCheckpoint(path, **settings):
+    with open(path, "rb") as file:
+        return restoreScheduler(file.read(), **settings)
@@ -0,0 +1,277 @@
+import argparse
+import sys
+
+from scheduler import PLACEMENTS, Scheduler
+
+
+STARTUP_TARGET = 0.1  ## seconds a short "simulate" run may take from a cold start
+
+
+# ----------------------------------------------------------------------------
+#    Command line interface. Each subcommand imports what it needs when it runs, so a short
+#    "simulate" never loads NumPy, the benchmark suite or the sweep runner.
+#
+#    python cli.py simulate [--processes N] [--seed S] [--process-interval I]
+#                           [--placement P] [--trace PATH] [--batch [--cache DIR]]
+#                           [--shortest-first]
+#    python cli.py bench [--processes N] [--seeds S ...] [--repetitions R] [--output PATH]
+#    python cli.py bench --startup RUNS
+#    python cli.py gen-trace PATH [--processes N] [--seed S] [--rate R]
+# ----------------------------------------------------------------------------
+
+
+# ----------------------------------------------------------------------------
+#    simulate - runs one simulation and prints its summary as one line of JSON. Processes
+#               are generated from the seed, or replayed from a binary trace. Generated
+#               processes can be admitted shortest job first, sorted by burst time.
+# ----------------------------------------------------------------------------
+
+
+def simulate(options):
+    import json
+
+    from metrics import LatencyStats
+
+    turnaroundTimes = LatencyStats()
+    waitTimes = LatencyStats()
+    scheduler = Scheduler(options.process_interval, placement=options.placement)
+
+    if options.trace != None:
+        from process_trace import replayTrace
+
+        submitted = {}
+
+        def arrivals():
+            for timestamp, process in replayTrace(options.trace):
+                submitted[id(process)] = timestamp
+                yield (timestamp, process)
+
+        scheduler.streamProcesses(arrivals())
+        for process in completions(scheduler):
+            turnaroundTimes.add(process.completion_time - process.arrival_time)
+            waitTimes.add(process.arrival_time - submitted.pop(id(process)))
+    elif options.batch:
+        from process_generator import generateProcesses
+
+        cache = None
+        if options.cache != None:
+            from cache import openCache
+
+            cache = openCache(options.cache)
+        workload = generateProcesses(options.processes, options.seed)
+        if options.shortest_first:
+            from benchmark import sortWorkload
+
+            workload = sortWorkload(workload)
+        result = scheduler.run(workload, cache)
+        for arrival, completion in zip(
+            result.arrival_time.tolist(), result.completion_time.tolist()
+        ):
+            turnaroundTimes.add(completion - arrival)
+            waitTimes.add(arrival)
+    else:
+        import random
+
+        from process_generator import generateProcess
+
+        random.seed(options.seed)
+        processes = [generateProcess() for count in range(options.processes)]
+        if options.shortest_first:
+            from benchmark import sortProcesses
+
+            sortProcesses(processes)
+        scheduler.loadProcesses(processes)
+        if options.process_interval == 0:
+            completed = scheduler.fastForward()
+        else:
+            completed = completions(scheduler)
+        for process in completed:
+            turnaroundTimes.add(process.completion_time - process.arrival_time)
+            waitTimes.add(process.arrival_time)
+
+    json.dump(
+        {
+            "completed": turnaroundTimes.stats.count,
+            "clock": scheduler.clock,
+            "turnaround_time": turnaroundTimes.summary(),
+            "wait_time": waitTimes.summary(),
+        },
+        sys.stdout,
+    )
+    sys.stdout.write("\n")
+    return 0
+
+
+# ----------------------------------------------------------------------------
+#    completions - generator of the processes a scheduler completes, calling detachProcess
+#                  until it returns "None". With a process interval detachProcess also returns
+#                  a process at the end of each interval, which hasn't completed yet.
+# ----------------------------------------------------------------------------
+
+
+def completions(scheduler):
+    while True:
+        process = scheduler.detachProcess()
+        if process == None:
+            return
+        if process.completion_time != -1:
+            yield process
+
+
+# ----------------------------------------------------------------------------
+#    bench - runs the benchmark suite and prints or saves its report, or with --startup,
+#            times cold starts of a short simulate run against STARTUP_TARGET
+# ----------------------------------------------------------------------------
+
+
+def bench(options):
+    import json
+
+    if options.startup:
+        report = benchmarkStartup(options.startup)
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0 if report["median"] <= report["target"] else 1
+
+    from benchmark import benchmarkSuite, saveReport
+
+    report = benchmarkSuite(
+        options.process_interval,
+        processes=options.processes,
+        seeds=options.seeds,
+        warmups=options.warmups,
+        repetitions=options.repetitions,
+    )
+    if options.output != None:
+        saveReport(report, options.output)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    return 0
+
+
+# ----------------------------------------------------------------------------
+#    benchmarkStartup - times fresh interpreters running a short simulation from this CLI
+#
+#
+#    @params:  runs : int                  - number of interpreters started
+#
+#    @returns - report : dict              - median, 95th percentile and maximum wall time in
+#                                            seconds, with the target they're held to
+# ----------------------------------------------------------------------------
+
+
+def benchmarkStartup(runs):
+    import os
+    import subprocess
+    import time
+
+    command = [
+        sys.executable,
+        os.path.abspath(__file__),
+        "simulate",
+        "--processes",
+        "10",
+        "--seed",
+        "0",
+    ]
+    times = []
+    for run in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    return {
+        "runs": runs,
+        "median": times[len(times) // 2],
+        "p95": times[min(int(len(times) * 0.95), len(times) - 1)],
+        "max": times[-1],
+        "target": STARTUP_TARGET,
+    }
+
+
+# ----------------------------------------------------------------------------
+#    generateTrace - writes a binary trace of generated processes. Arrivals are a Poisson
+#                    process of the given rate, or all at zero without one.
+# ----------------------------------------------------------------------------
+
+
+def generateTrace(options):
+    import numpy as np
+
+    from process_generator import generateProcesses
+    from process_trace import writeTrace
+
+    workload = generateProcesses(options.processes, options.seed)
+    timestamps = None
+    if options.rate != None:
+        rng = np.random.default_rng(options.seed)
+        timestamps = np.cumsum(rng.exponential(1 / options.rate, len(workload)))
+    writeTrace(options.path, workload, timestamps)
+    return 0
+
+
+# ----------------------------------------------------------------------------
+#    makeParser - builds the argument parser of every subcommand
+# ----------------------------------------------------------------------------
+
+
+def makeParser():
+    parser = argparse.ArgumentParser(
+        prog="scheduler", description="Simulate and benchmark process scheduling."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    simulateParser = commands.add_parser("simulate", help="run one simulation")
+    simulateParser.add_argument("--processes", type=int, default=250)
+    simulateParser.add_argument("--seed", type=int, default=None)
+    simulateParser.add_argument("--process-interval", type=int, default=0)
+    simulateParser.add_argument("--placement", choices=PLACEMENTS, default="first")
+    simulateParser.add_argument("--trace", help="binary trace to replay")
+    simulateParser.add_argument(
+        "--batch", action="store_true", help="use the NumPy batch engine"
+    )
+    simulateParser.add_argument(
+        "--cache", metavar="DIR", help="result cache directory for --batch runs"
+    )
+    simulateParser.add_argument(
+        "--shortest-first",
+        action="store_true",
+        help="admit generated processes in order of burst time",
+    )
+    simulateParser.set_defaults(run=simulate)
+
+    benchParser = commands.add_parser("bench", help="run the benchmark suite")
+    benchParser.add_argument("--processes", type=int, default=250)
+    benchParser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2])
+    benchParser.add_argument("--warmups", type=int, default=1)
+    benchParser.add_argument("--repetitions", type=int, default=5)
+    benchParser.add_argument("--process-interval", type=int, default=0)
+    benchParser.add_argument("--output", help="file to save the JSON report to")
+    benchParser.add_argument(
+        "--startup",
+        type=int,
+        default=0,
+        metavar="RUNS",
+        help="time RUNS cold starts of a short simulate instead",
+    )
+    benchParser.set_defaults(run=bench)
+
+    traceParser = commands.add_parser("gen-trace", help="write a binary process trace")
+    traceParser.add_argument("path")
+    traceParser.add_argument("--processes", type=int, default=250)
+    traceParser.add_argument("--seed", type=int, default=None)
+    traceParser.add_argument(
+        "--rate", type=float, default=None, help="arrivals per unit of clock time"
+    )
+    traceParser.set_defaults(run=generateTrace)
+    return parser
+
+
+def main(argv=None):
+    options = makeParser().parse_args(argv)
+    return options.run(options)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
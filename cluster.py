@@ -0,0 +1,615 @@
+from dataclasses import dataclass
+import heapq
+import multiprocessing
+import random
+import time
+
+from scheduler import DEFAULT_MACHINE, Scheduler
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    NodeLoad - dataclass stucture describing how busy a node is, as last reported
+#               by the node or as estimated by the Cluster since
+#
+#
+#    @fields:   running : int               - processes occupying a processor.
+#
+#               queued : int                - processes waiting in the process queue.
+#
+#               vacant : int                - vacant processors.
+#
+#               largest_free : int          - memory of the largest vacant processor in MB,
+#                                             -1 if every processor is occupied.
+#
+#               capacity : int              - memory of the node's largest processor in MB.
+#                                             Processes needing more are never sent to it.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+@dataclass(slots=True)
+class NodeLoad:
+    running: int
+    queued: int
+    vacant: int
+    largest_free: int
+    capacity: int
+
+    def jobs(self):
+        return self.running + self.queued
+
+    # ----------------------------------------------------------------------------
+    #    addProcess - function that updates the load for a process sent to the node. It's
+    #                 expected to start if the largest vacant processor fits it. The memory
+    #                 of the other vacant processors isn't known, so once every vacant
+    #                 processor is expected to be occupied largest_free drops to -1.
+    # ----------------------------------------------------------------------------
+
+    def addProcess(self, memory_footprint):
+        if self.vacant > 0 and self.largest_free >= memory_footprint:
+            self.running = self.running + 1
+            self.vacant = self.vacant - 1
+            if self.vacant == 0:
+                self.largest_free = -1
+        else:
+            self.queued = self.queued + 1
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    LeastLoadedBalancer - sends each process to the node with the fewest running and
+#                          queued processes. Ties go to the lowest node. Scans every node,
+#                          so placement cost grows linearly with the fleet.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class LeastLoadedBalancer:
+
+    # ----------------------------------------------------------------------------
+    #    choose - function that picks the node a process is sent to
+    #
+    #
+    #    @params:       loads : list            - NodeLoad of each node
+    #
+    #                   process : Process       - process being placed
+    #
+    #    @returns:      node : int              - index of the node. Returns -1 if no node has
+    #                                             enough memory for the process.
+    #
+    # ----------------------------------------------------------------------------
+
+    def choose(self, loads, process):
+        node = -1
+        fewestJobs = None
+        for index, load in enumerate(loads):
+            if load.capacity >= process.memory_footprint and (
+                fewestJobs == None or load.jobs() < fewestJobs
+            ):
+                fewestJobs = load.jobs()
+                node = index
+        return node
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    PowerOfTwoBalancer - samples two nodes at random and sends the process to the one
+#                         with fewer jobs. Constant placement cost whatever the fleet size,
+#                         with a maximum load close to least loaded.
+#
+#
+#    @fields:   random : Random             - source of the samples.
+#
+#               attempts : int              - samples tried before falling back to a least
+#                                             loaded scan when few nodes have enough memory.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class PowerOfTwoBalancer(LeastLoadedBalancer):
+    def __init__(self, seed=None, attempts=8):
+        self.random = random.Random(seed)
+        self.attempts = attempts
+
+    def choose(self, loads, process):
+        chosen = []
+        for attempt in range(self.attempts):
+            node = self.random.randrange(len(loads))
+            if loads[node].capacity >= process.memory_footprint:
+                chosen.append(node)
+                if len(chosen) == 2:
+                    first, second = chosen
+                    return (
+                        first if loads[first].jobs() <= loads[second].jobs() else second
+                    )
+        if chosen:
+            return chosen[0]
+        return LeastLoadedBalancer.choose(self, loads, process)
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    MemoryAwareBalancer - least loaded among the nodes with a vacant processor large
+#                          enough for the process, so it can start right away. Falls back
+#                          to least loaded among the nodes it could ever run on.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class MemoryAwareBalancer(LeastLoadedBalancer):
+    def choose(self, loads, process):
+        node = -1
+        fewestJobs = None
+        for index, load in enumerate(loads):
+            if load.largest_free >= process.memory_footprint and (
+                fewestJobs == None or load.jobs() < fewestJobs
+            ):
+                fewestJobs = load.jobs()
+                node = index
+        if node == -1:
+            return LeastLoadedBalancer.choose(self, loads, process)
+        return node
+
+
+LOAD_BALANCERS = {
+    "least-loaded": LeastLoadedBalancer,
+    "power-of-two": PowerOfTwoBalancer,
+    "memory-aware": MemoryAwareBalancer,
+}
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    NodeShard - the nodes simulated by one worker, one Scheduler each. Runs inside the
+#                worker process, or in the calling process when the Cluster has no
+#                workers. Requests are made with request and their result collected with
+#                getResponse, so a Cluster drives local and remote shards the same way.
+#
+#
+#    @fields:   nodes : list                - cluster-wide index of each node of the shard.
+#
+#               schedulers : list           - Scheduler of each node.
+#
+#               response : object           - result of the last request.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class NodeShard:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   nodes : list             - cluster-wide index of each node
+    #
+    #               machines : list          - machine description of each node
+    #
+    #               placement : str          - placement policy of every node
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, nodes, machines, placement="first"):
+        self.nodes = nodes
+        self.schedulers = [
+            Scheduler(machine=machine, placement=placement) for machine in machines
+        ]
+        self.response = None
+
+    def request(self, method, *args):
+        self.response = getattr(self, method)(*args)
+
+    def getResponse(self):
+        return self.response
+
+    def close(self):
+        pass
+
+    # ----------------------------------------------------------------------------
+    #    advance - function that simulates every node of the shard up to the same clock.
+    #              Processes completing at or before it are detached. The clock of each node
+    #              stays at its last event rather than being moved forward to until, since
+    #              moving it would let processes of other clock speed classes complete at the
+    #              epoch boundary. The next epoch's arrivals are then admitted exactly as if
+    #              they had been streamed into the node all along.
+    #
+    #
+    #    @params:       until : float           - clock to simulate up to
+    #
+    #                   batches : list          - (timestamp, Process) pairs arriving at each node
+    #                                             before until, in order of timestamp
+    #
+    #    @returns:      completed : list        - (node, Process) of every process that completed
+    #
+    #                   loads : list            - NodeLoad of each node at until
+    #
+    # ----------------------------------------------------------------------------
+
+    def advance(self, until, batches):
+        completed = []
+        for node, scheduler, batch in zip(self.nodes, self.schedulers, batches):
+            scheduler.streamProcesses(batch)
+            while True:
+                scheduler.admitArrivals()
+                finish = scheduler.getNextCompletionTime()
+                if finish == None or finish > until:
+                    break
+                completed.append((node, scheduler.detachProcess()))
+        return completed, self.getLoads()
+
+    # ----------------------------------------------------------------------------
+    #    steal - function that takes queued processes off nodes to move them to another node.
+    #            Processes are taken from the front of the queue, stopping at the first one
+    #            that wouldn't fit on the node stealing it.
+    #
+    #
+    #    @params:       requests : list         - (shard node, count, capacity) of each node to steal
+    #                                             from, where shard node is its index in the shard and
+    #                                             capacity the largest memory of the stealing node
+    #
+    #    @returns:      stolen : list           - list of stolen processes per request
+    #
+    # ----------------------------------------------------------------------------
+
+    def steal(self, requests):
+        stolen = []
+        for shardNode, count, capacity in requests:
+            process_queue = self.schedulers[shardNode].process_queue
+            processes = []
+            while (
+                len(processes) < count
+                and process_queue
+                and process_queue.peek().memory_footprint <= capacity
+            ):
+                processes.append(process_queue.pop())
+            stolen.append(processes)
+        return stolen
+
+    def getLoads(self):
+        loads = []
+        for scheduler in self.schedulers:
+            pool = scheduler.pool
+            running = sum(1 for process in pool.current_processes if process != None)
+            loads.append(
+                NodeLoad(
+                    running,
+                    len(scheduler.process_queue),
+                    len(pool) - running,
+                    pool.free_memory[1],
+                    max(pool.memory, default=-1),
+                )
+            )
+        return loads
+
+
+# ----------------------------------------------------------------------------
+#    serveShard - main loop of a worker process. Builds its NodeShard and answers
+#                 requests sent over the connection until it receives "None".
+#
+#
+#    @params:  connection : Connection     - worker's end of the pipe to the Cluster
+#
+#              nodes : list                - cluster-wide index of each node of the shard
+#
+#              machines : list             - machine description of each node
+#
+#              placement : str             - placement policy of every node
+# ----------------------------------------------------------------------------
+
+
+def serveShard(connection, nodes, machines, placement):
+    shard = NodeShard(nodes, machines, placement)
+    while True:
+        message = connection.recv()
+        if message == None:
+            break
+        method, args = message
+        shard.request(method, *args)
+        connection.send(shard.getResponse())
+    connection.close()
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    RemoteShard - a NodeShard running in a worker process, driven over a pipe
+#
+#
+#    @fields:   connection : Connection     - Cluster's end of the pipe to the worker.
+#
+#               worker : Process            - the worker process.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class RemoteShard:
+    def __init__(self, context, nodes, machines, placement="first"):
+        self.connection, workerConnection = context.Pipe()
+        self.worker = context.Process(
+            target=serveShard,
+            args=(workerConnection, nodes, machines, placement),
+            daemon=True,
+        )
+        self.worker.start()
+        workerConnection.close()
+
+    def request(self, method, *args):
+        self.connection.send((method, args))
+
+    def getResponse(self):
+        return self.connection.recv()
+
+    def close(self):
+        self.connection.send(None)
+        self.worker.join()
+        self.connection.close()
+
+
+# ---------------------/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\----------------------
+#
+#    Cluster - a fleet of nodes, each simulated by its own Scheduler. Incoming processes
+#              are sent to a node by a load balancer and never leave it, unless work
+#              stealing moves them while they're still queued.
+#
+#              Nodes are simulated in epochs of simulated time. At the start of an epoch
+#              the balancer places the epoch's arrivals using the loads reported at the
+#              end of the last epoch, updated by its own placements since. Then every shard
+#              simulates its nodes up to the end of the epoch, in parallel when there are
+#              workers. Shorter epochs make the loads fresher at the cost of more rounds.
+#              Epochs only decide when the balancer sees the loads, not the simulation
+#              itself, so a one-node cluster gives exactly the same completion times as a
+#              Scheduler streaming the same arrivals.
+#
+#
+#    @fields:   epoch : float               - length of an epoch on the Scheduler clock.
+#
+#               balancer : LeastLoadedBalancer - load balancer.
+#
+#               stealing : bool             - whether idle nodes steal queued processes from
+#                                             the busiest nodes at the start of each epoch.
+#
+#               clock : float               - end of the last simulated epoch.
+#
+#               loads : list                - NodeLoad of each node.
+#
+#               shards : list               - NodeShard or RemoteShard simulating the nodes.
+#
+#               shard_nodes : list          - nodes simulated by each shard. Node i is simulated
+#                                             by shard i % len(shards).
+#
+#               locations : list            - (shard, shard node) of each node.
+#
+#               epochs : int                - epochs simulated.
+#
+#               placements : int            - processes placed by the balancer.
+#
+#               placement_time : float      - seconds spent in the balancer.
+#
+#               steals : int                - processes moved by work stealing.
+#
+# ---------------------\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/----------------------
+
+
+class Cluster:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   machines : list          - machine description of each node, e.g. from
+    #                                          makeFleet
+    #
+    #               epoch : float            - length of an epoch on the Scheduler clock
+    #
+    #               balancer : object        - load balancer. defaults to LeastLoadedBalancer.
+    #
+    #               stealing : bool          - enables work stealing. defaults to False.
+    #
+    #               workers : int            - worker processes the nodes are sharded over.
+    #                                          defaults to zero, which simulates every node
+    #                                          in the calling process.
+    #
+    #               placement : str          - placement policy of every node. defaults to "first".
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(
+        self,
+        machines,
+        epoch,
+        balancer=None,
+        stealing=False,
+        workers=0,
+        placement="first",
+    ):
+        if epoch <= 0:
+            raise ValueError("epoch must be positive")
+        self.epoch = epoch
+        self.balancer = balancer if balancer != None else LeastLoadedBalancer()
+        self.stealing = stealing
+        self.clock = 0
+        self.epochs = 0
+        self.placements = 0
+        self.placement_time = 0.0
+        self.steals = 0
+
+        shardCount = max(1, min(workers, len(machines)))
+        self.shard_nodes = [
+            list(range(shard, len(machines), shardCount)) for shard in range(shardCount)
+        ]
+        self.locations = [None] * len(machines)
+        self.shards = []
+        context = multiprocessing.get_context() if workers > 0 else None
+        for shard, nodes in enumerate(self.shard_nodes):
+            shardMachines = [machines[node] for node in nodes]
+            if context != None:
+                self.shards.append(
+                    RemoteShard(context, nodes, shardMachines, placement)
+                )
+            else:
+                self.shards.append(NodeShard(nodes, shardMachines, placement))
+            for shardNode, node in enumerate(nodes):
+                self.locations[node] = (shard, shardNode)
+
+        self.loads = [None] * len(machines)
+        for shard in self.shards:
+            shard.request("getLoads")
+        for shard, nodes in zip(self.shards, self.shard_nodes):
+            for node, load in zip(nodes, shard.getResponse()):
+                self.loads[node] = load
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----------------------------------------------------------------------------
+    #    close - function that stops the worker processes
+    # ----------------------------------------------------------------------------
+
+    def close(self):
+        for shard in self.shards:
+            shard.close()
+        self.shards = []
+
+    # ----------------------------------------------------------------------------
+    #    place - function that sends a process to a node chosen by the balancer and updates
+    #            the node's estimated load
+    #
+    #
+    #    @params:       process : Process       - process being placed
+    #
+    #    @returns:      node : int              - index of the node
+    #
+    # ----------------------------------------------------------------------------
+
+    def place(self, process):
+        start = time.perf_counter()
+        node = self.balancer.choose(self.loads, process)
+        self.placement_time = self.placement_time + time.perf_counter() - start
+        self.placements = self.placements + 1
+        if node == -1:
+            raise ValueError(
+                "process %d needs more memory than any node has" % process.PID
+            )
+        self.loads[node].addProcess(process.memory_footprint)
+        return node
+
+    # ----------------------------------------------------------------------------
+    #    stealWork - function that pairs each idle node with the node with the longest
+    #                process queue and moves up to half of that queue, no more than the idle
+    #                node has vacant processors. Returns the stolen processes as arrivals at
+    #                the current clock.
+    #
+    #
+    #    @returns:      batches : list          - list of (timestamp, Process) pairs per node
+    #
+    # ----------------------------------------------------------------------------
+
+    def stealWork(self):
+        batches = [[] for load in self.loads]
+        victims = [
+            (-load.queued, node)
+            for node, load in enumerate(self.loads)
+            if load.queued > 0
+        ]
+        heapq.heapify(victims)
+        requests = [[] for shard in self.shards]
+        thieves = [[] for shard in self.shards]
+        for node, load in enumerate(self.loads):
+            if not victims:
+                break
+            if load.vacant == 0 or load.queued > 0:
+                continue
+            queued, victim = heapq.heappop(victims)
+            count = min(load.vacant, (1 - queued) // 2)
+            shard, shardNode = self.locations[victim]
+            requests[shard].append((shardNode, count, load.capacity))
+            thieves[shard].append(node)
+            if -queued - count > 0:
+                heapq.heappush(victims, (queued + count, victim))
+
+        for shard, shardRequests in zip(self.shards, requests):
+            if shardRequests:
+                shard.request("steal", shardRequests)
+        for shard, nodes, shardRequests, shardThieves in zip(
+            self.shards, self.shard_nodes, requests, thieves
+        ):
+            if not shardRequests:
+                continue
+            for (shardNode, count, capacity), thief, processes in zip(
+                shardRequests, shardThieves, shard.getResponse()
+            ):
+                victim = self.loads[nodes[shardNode]]
+                victim.queued = victim.queued - len(processes)
+                for process in processes:
+                    batches[thief].append((self.clock, process))
+                    self.loads[thief].addProcess(process.memory_footprint)
+                self.steals = self.steals + len(processes)
+        return batches
+
+    # ----------------------------------------------------------------------------
+    #    run - function that simulates a stream of arrivals across the fleet until every
+    #          process has completed. Completions are yielded at the end of each epoch, so
+    #          an unbounded stream can be consumed as it's simulated.
+    #
+    #
+    #    @params:       arrivals : iterable     - (timestamp, Process) pairs in order of timestamp,
+    #                                             e.g. generateArrivals
+    #
+    #    @returns:      completions : generator - (node, Process) of each completed process, in
+    #                                             order of completion within an epoch
+    #
+    # ----------------------------------------------------------------------------
+
+    def run(self, arrivals):
+        arrivals = iter(arrivals)
+        pending = next(arrivals, None)
+        while True:
+            if pending != None and all(load.jobs() == 0 for load in self.loads):
+                ## every node is idle, skip ahead
+                self.clock = max(self.clock, pending[0])
+            until = self.clock + self.epoch
+            if self.stealing:
+                batches = self.stealWork()
+            else:
+                batches = [[] for load in self.loads]
+            while pending != None and pending[0] < until:
+                batches[self.place(pending[1])].append(pending)
+                pending = next(arrivals, None)
+
+            for shard, nodes in zip(self.shards, self.shard_nodes):
+                shard.request(
+                    "advance",
+                    until,
+                    [batches[node] for node in nodes],
+                )
+            completed = []
+            for shard, nodes in zip(self.shards, self.shard_nodes):
+                shardCompleted, shardLoads = shard.getResponse()
+                completed.extend(shardCompleted)
+                for node, load in zip(nodes, shardLoads):
+                    self.loads[node] = load
+            self.clock = until
+            self.epochs = self.epochs + 1
+
+            completed.sort(key=lambda completion: completion[1].completion_time)
+            yield from completed
+            if pending == None and all(load.jobs() == 0 for load in self.loads):
+                return
+
+
+# ----------------------------------------------------------------------------
+#    makeFleet - returns the machine descriptions of a fleet of identical nodes
+#
+#
+#    @params:  nodes : int                 - number of nodes
+#
+#              machine : list              - machine description of every node. defaults to
+#                                            DEFAULT_MACHINE.
+#
+#    @returns - machines : list
+# ----------------------------------------------------------------------------
+
+
+def makeFleet(nodes, machine=DEFAULT_MACHINE):
+    return [machine] * nodes
@@ -0,0 +1,202 @@
+import time
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    Instrumentation - counters, timers and an optional event sink for a Scheduler.
+#                      Installing it wraps the scheduler's methods on that one instance,
+#                      so an uninstrumented Scheduler runs its plain methods and pays
+#                      nothing. The scheduler's instrumentation field points back to it
+#                      while installed. Scheduler.run bypasses these methods and isn't measured.
+#
+#
+#    @fields:   calls : dict                - number of calls of each wrapped method by name.
+#
+#               times : dict                - seconds spent in each wrapped method by name. Includes
+#                                             time spent in nested calls, e.g. detachProcess
+#                                             includes the attachProcess calls it makes.
+#
+#               migrations : int            - processes moved to another processor by
+#                                             attachProcessFromProcessor.
+#
+#               queue_length_max : int      - longest process queue seen after a detach.
+#
+#               queue_length_sum : int      - sum of the process queue length after each detach.
+#
+#               busy_times : list           - clock time each processor has been occupied for.
+#
+#               busy_since : list           - clock at which each processor became occupied,
+#                                             "None" while vacant.
+#
+#               start_clock : float         - scheduler clock when the instrumentation was installed.
+#
+#               sink : function             - called as sink(event, clock, process, index). "attach" and
+#                                             "detach" events are sent whenever a process is placed on
+#                                             or removed from a processor, including both halves of a
+#                                             migration, which is followed by a "migrate" event. A
+#                                             "complete" event follows the "detach" of a process that
+#                                             has finished. A "submit" event, with index -1, is sent
+#                                             when a new process is handed to submitProcess, before it's
+#                                             attached or queued. "None" disables the event trace.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class Instrumentation:
+
+    WRAPPED = ("attachProcess", "detachProcess", "attachProcessFromProcessor")
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   sink : function          - event sink. defaults to "None".
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, sink=None):
+        self.sink = sink
+        self.calls = {name: 0 for name in self.WRAPPED}
+        self.times = {name: 0.0 for name in self.WRAPPED}
+        self.migrations = 0
+        self.queue_length_max = 0
+        self.queue_length_sum = 0
+        self.busy_times = []
+        self.busy_since = []
+        self.start_clock = 0
+
+    # ----------------------------------------------------------------------------
+    #    install - function that starts measuring a scheduler
+    #
+    #
+    #    @params:       scheduler : Scheduler   - scheduler to measure
+    #
+    # ----------------------------------------------------------------------------
+
+    def install(self, scheduler):
+        scheduler.instrumentation = self
+        self.start_clock = scheduler.clock
+        self.busy_times = [0] * len(scheduler.pool)
+        self.busy_since = [
+            scheduler.clock if process != None else None
+            for process in scheduler.pool.current_processes
+        ]
+        for name in self.WRAPPED:
+            setattr(scheduler, name, self.timed(name, getattr(scheduler, name)))
+
+        detachProcess = scheduler.detachProcess
+        attachProcessFromProcessor = scheduler.attachProcessFromProcessor
+        setProcess = scheduler.setProcess
+        submitProcess = scheduler.submitProcess
+
+        def trackedSubmitProcess(newProcess):
+            self.emit("submit", scheduler.clock, newProcess, -1)
+            submitProcess(newProcess)
+
+        def countedDetachProcess():
+            endingProcess = detachProcess()
+            length = len(scheduler.process_queue)
+            self.queue_length_sum = self.queue_length_sum + length
+            if length > self.queue_length_max:
+                self.queue_length_max = length
+            return endingProcess
+
+        def countedAttachProcessFromProcessor(index, nextProcessorToComplete):
+            migratingProcess = scheduler.pool.current_processes[nextProcessorToComplete]
+            attachProcessFromProcessor(index, nextProcessorToComplete)
+            if scheduler.pool.current_processes[index] is migratingProcess:
+                self.migrations = self.migrations + 1
+                self.emit("migrate", scheduler.clock, migratingProcess, index)
+
+        def trackedSetProcess(index, process):
+            previousProcess = scheduler.pool.current_processes[index]
+            if previousProcess != None:
+                self.busy_times[index] = (
+                    self.busy_times[index] + scheduler.clock - self.busy_since[index]
+                )
+                self.busy_since[index] = None
+                if process == None:
+                    self.emit("detach", scheduler.clock, previousProcess, index)
+                    if previousProcess.completion_time != -1:
+                        self.emit("complete", scheduler.clock, previousProcess, index)
+            setProcess(index, process)
+            if process != None:
+                self.busy_since[index] = scheduler.clock
+                self.emit("attach", scheduler.clock, process, index)
+
+        scheduler.detachProcess = countedDetachProcess
+        scheduler.attachProcessFromProcessor = countedAttachProcessFromProcessor
+        scheduler.setProcess = trackedSetProcess
+        scheduler.submitProcess = trackedSubmitProcess
+
+    # ----------------------------------------------------------------------------
+    #    remove - function that stops measuring a scheduler and restores its plain methods
+    #
+    #
+    #    @params:       scheduler : Scheduler   - scheduler the instrumentation was installed on
+    #
+    # ----------------------------------------------------------------------------
+
+    def remove(self, scheduler):
+        for name in self.WRAPPED + ("setProcess", "submitProcess"):
+            scheduler.__dict__.pop(name, None)
+        scheduler.instrumentation = None
+
+    # ----------------------------------------------------------------------------
+    #    timed - helper function that wraps a method to count its calls and time them
+    #
+    #
+    #    @params:       name : str              - name the method is recorded under
+    #
+    #                   method : function       - bound method to wrap
+    #
+    #    @returns:      wrapper : function
+    #
+    # ----------------------------------------------------------------------------
+
+    def timed(self, name, method):
+        def wrapper(*args):
+            start = time.perf_counter()
+            try:
+                return method(*args)
+            finally:
+                self.times[name] = self.times[name] + time.perf_counter() - start
+                self.calls[name] = self.calls[name] + 1
+
+        return wrapper
+
+    # ----------------------------------------------------------------------------
+    #    emit - helper function that passes an event to the sink, if there is one
+    # ----------------------------------------------------------------------------
+
+    def emit(self, event, clock, process, index):
+        if self.sink != None:
+            self.sink(event, clock, process, index)
+
+    # ----------------------------------------------------------------------------
+    #    utilization - function that returns the fraction of clock time each processor
+    #                  has been occupied for since the instrumentation was installed
+    #
+    #
+    #    @params:       scheduler : Scheduler   - scheduler the instrumentation was installed on
+    #
+    #    @returns:      utilization : list      - utilization of each processor between 0 and 1
+    #
+    # ----------------------------------------------------------------------------
+
+    def utilization(self, scheduler):
+        elapsed = scheduler.clock - self.start_clock
+        if elapsed <= 0:
+            return [0.0] * len(self.busy_times)
+        return [
+            (busyTime + (scheduler.clock - busySince if busySince != None else 0))
+            / elapsed
+            for busyTime, busySince in zip(self.busy_times, self.busy_since)
+        ]
+
+    # ----------------------------------------------------------------------------
+    #    averageQueueLength - function that returns the average process queue length after a detach
+    # ----------------------------------------------------------------------------
+
+    def averageQueueLength(self):
+        detaches = self.calls["detachProcess"]
+        return self.queue_length_sum / detaches if detaches else 0
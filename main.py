@@ -1,11 +1,8 @@
-import copy
 from scheduler import Scheduler
-from benchmark import (
-    benchmarkQuestionFourAlgorithm,
-)
 
 
 def main():
+    from benchmark import benchmarkQuestionFourAlgorithm
 
     benchmarkQuestionFourAlgorithm(Scheduler())
 
@@ -0,0 +1,502 @@
+import bisect
+import math
+
+
+P2_EXACT_SAMPLES = (
+    1000  ## values a P2Quantile keeps, and answers exactly from, before estimating
+)
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    RunningStats - count, mean, variance, minimum and maximum of a stream of values in
+#                   constant memory, using Welford's algorithm. Two RunningStats can be
+#                   merged, e.g. the results of parallel runs.
+#
+#
+#    @fields:   count : int                 - number of values.
+#
+#               mean : float                - mean of the values.
+#
+#               m2 : float                  - sum of squared differences from the mean.
+#
+#               minimum : float             - smallest value, "inf" until the first one.
+#
+#               maximum : float             - largest value, "-inf" until the first one.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class RunningStats:
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+
+    def add(self, value):
+        self.count = self.count + 1
+        delta = value - self.mean
+        self.mean = self.mean + delta / self.count
+        self.m2 = self.m2 + delta * (value - self.mean)
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+
+    # ----------------------------------------------------------------------------
+    #    merge - function that adds the values of another RunningStats to this one
+    #
+    #
+    #    @params:       other : RunningStats    - statistics to merge in
+    #
+    # ----------------------------------------------------------------------------
+
+    def merge(self, other):
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean = self.mean + delta * other.count / count
+        self.m2 = self.m2 + other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.minimum = min(self.minimum, other.minimum)
+        self.maximum = max(self.maximum, other.maximum)
+
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def stdev(self):
+        return math.sqrt(self.variance())
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    P2Quantile - estimate of one quantile of a stream of values in constant memory, using
+#                 the P-square algorithm of Jain and Chlamtac. Five markers track the
+#                 minimum, the quantile, the maximum and two points halfway between, and
+#                 are moved towards their desired positions as values arrive.
+#
+#                 P-square is unreliable over a few values, e.g. it can put the 95th
+#                 percentile of 50 values above the 99th. So the first exact values are
+#                 kept, and the quantile is computed from them the same way as
+#                 numpy.percentile. Once there are more, the markers start at the ranks
+#                 they would have reached and the kept values are dropped.
+#
+#
+#    @fields:   quantile : float            - quantile being estimated, between 0 and 1.
+#
+#               count : int                 - number of values.
+#
+#               exact : int                 - number of values kept before estimating.
+#
+#               samples : list              - values, sorted, until there are more than exact.
+#
+#               heights : list              - height of each marker. Empty until there are more
+#                                             than exact values.
+#
+#               positions : list            - position of each marker.
+#
+#               desired : list              - desired position of each marker.
+#
+#               increments : list           - increase in desired position per value.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class P2Quantile:
+    def __init__(self, quantile, exact=P2_EXACT_SAMPLES):
+        if not 0 < quantile < 1:
+            raise ValueError("quantile must be between 0 and 1")
+        self.quantile = quantile
+        self.count = 0
+        self.exact = max(exact, 5)
+        self.samples = []
+        self.heights = []
+        self.positions = []
+        self.desired = []
+        self.increments = [0, quantile / 2, quantile, (1 + quantile) / 2, 1]
+
+    def add(self, value):
+        self.count = self.count + 1
+        if self.count <= self.exact:
+            bisect.insort(self.samples, value)
+            return
+        if not self.heights:
+            self.placeMarkers()
+
+        heights = self.heights
+        positions = self.positions
+        if value < heights[0]:
+            heights[0] = value
+            cell = 0
+        elif value >= heights[4]:
+            heights[4] = value
+            cell = 3
+        else:
+            cell = bisect.bisect_right(heights, value) - 1
+        for marker in range(cell + 1, 5):
+            positions[marker] = positions[marker] + 1
+        for marker in range(5):
+            self.desired[marker] = self.desired[marker] + self.increments[marker]
+
+        for marker in range(1, 4):
+            offset = self.desired[marker] - positions[marker]
+            if (offset >= 1 and positions[marker + 1] - positions[marker] > 1) or (
+                offset <= -1 and positions[marker - 1] - positions[marker] < -1
+            ):
+                step = 1 if offset > 0 else -1
+                height = self.parabolic(marker, step)
+                if not heights[marker - 1] < height < heights[marker + 1]:
+                    height = heights[marker] + step * (
+                        heights[marker + step] - heights[marker]
+                    ) / (positions[marker + step] - positions[marker])
+                heights[marker] = height
+                positions[marker] = positions[marker] + step
+
+    # ----------------------------------------------------------------------------
+    #    placeMarkers - helper function that starts the markers from the kept values. Each
+    #                   marker is put at the rank closest to its desired position, no two at
+    #                   the same rank.
+    # ----------------------------------------------------------------------------
+
+    def placeMarkers(self):
+        samples = self.samples
+        count = len(samples)
+        self.desired = [1 + (count - 1) * increment for increment in self.increments]
+        positions = [int(round(desired)) for desired in self.desired]
+        for marker in range(1, 5):
+            positions[marker] = max(positions[marker], positions[marker - 1] + 1)
+        positions[4] = count
+        for marker in range(3, -1, -1):
+            positions[marker] = min(positions[marker], positions[marker + 1] - 1)
+        self.positions = positions
+        self.heights = [samples[position - 1] for position in positions]
+        self.samples = []
+
+    # ----------------------------------------------------------------------------
+    #    parabolic - helper function that returns the piecewise-parabolic prediction of a
+    #                marker's height after moving it one position
+    # ----------------------------------------------------------------------------
+
+    def parabolic(self, marker, step):
+        heights = self.heights
+        positions = self.positions
+        return heights[marker] + step / (
+            positions[marker + 1] - positions[marker - 1]
+        ) * (
+            (positions[marker] - positions[marker - 1] + step)
+            * (heights[marker + 1] - heights[marker])
+            / (positions[marker + 1] - positions[marker])
+            + (positions[marker + 1] - positions[marker] - step)
+            * (heights[marker] - heights[marker - 1])
+            / (positions[marker] - positions[marker - 1])
+        )
+
+    # ----------------------------------------------------------------------------
+    #    value - function that returns the estimated quantile, "nan" if there are no values
+    # ----------------------------------------------------------------------------
+
+    def value(self):
+        if self.count == 0:
+            return float("nan")
+        if self.heights:
+            return self.heights[2]
+        samples = self.samples
+        rank = (len(samples) - 1) * self.quantile
+        below = int(rank)
+        above = min(below + 1, len(samples) - 1)
+        return samples[below] + (samples[above] - samples[below]) * (rank - below)
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    LatencyStats - running statistics and quantile estimates of a stream of times, in
+#                   constant memory
+#
+#
+#    @fields:   stats : RunningStats        - count, mean, variance and extremes.
+#
+#               quantiles : dict            - P2Quantile of each tracked quantile.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class LatencyStats:
+    def __init__(self, quantiles=(0.5, 0.95, 0.99)):
+        self.stats = RunningStats()
+        self.quantiles = {quantile: P2Quantile(quantile) for quantile in quantiles}
+
+    def add(self, value):
+        self.stats.add(value)
+        for estimate in self.quantiles.values():
+            estimate.add(value)
+
+    # ----------------------------------------------------------------------------
+    #    summary - function that returns the mean, tracked percentiles and maximum, keyed
+    #              the same way as benchmark.summarizeTimes. Empty if there are no values.
+    #              Each estimate is independent, so they're clamped to never decrease from
+    #              one percentile to the next and to stay between the minimum and maximum.
+    # ----------------------------------------------------------------------------
+
+    def summary(self):
+        if self.stats.count == 0:
+            return {}
+        summary = {"mean": self.stats.mean}
+        previous = self.stats.minimum
+        for quantile in sorted(self.quantiles):
+            value = min(
+                max(self.quantiles[quantile].value(), previous), self.stats.maximum
+            )
+            summary["p%g" % (quantile * 100)] = value
+            previous = value
+        summary["max"] = self.stats.maximum
+        return summary
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    SlidingWindowCounter - number of events over the last window of clock time. The
+#                           window is split into buckets and slides a bucket at a time,
+#                           so memory stays at one count per bucket. addSpan counts time
+#                           instead, e.g. how long a processor was busy for.
+#
+#
+#    @fields:   window : float              - length of the window.
+#
+#               width : float               - length of a bucket.
+#
+#               counts : list               - ring of event counts per bucket.
+#
+#               latest : int                - number of the latest bucket an event was counted in.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class SlidingWindowCounter:
+    def __init__(self, window, buckets=60):
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.window = window
+        self.width = window / buckets
+        self.counts = [0] * buckets
+        self.latest = 0
+
+    # ----------------------------------------------------------------------------
+    #    slide - helper function that empties the buckets that have left the window by clock
+    # ----------------------------------------------------------------------------
+
+    def slide(self, clock):
+        bucket = int(clock // self.width)
+        if bucket <= self.latest:
+            return
+        for expired in range(
+            self.latest + 1, min(bucket, self.latest + len(self.counts)) + 1
+        ):
+            self.counts[expired % len(self.counts)] = 0
+        self.latest = bucket
+
+    def add(self, clock, count=1):
+        self.slide(clock)
+        self.counts[int(clock // self.width) % len(self.counts)] += count
+
+    # ----------------------------------------------------------------------------
+    #    addSpan - function that adds the clock time from start to end, split between the
+    #              buckets it overlaps. Time before the window is dropped.
+    # ----------------------------------------------------------------------------
+
+    def addSpan(self, start, end):
+        self.slide(end)
+        first = max(int(start // self.width), self.latest - len(self.counts) + 1)
+        for bucket in range(first, int(end // self.width) + 1):
+            overlap = min(end, (bucket + 1) * self.width) - max(
+                start, bucket * self.width
+            )
+            if overlap > 0:
+                self.counts[bucket % len(self.counts)] += overlap
+
+    # ----------------------------------------------------------------------------
+    #    windowStart - function that returns the clock the counts go back to once the
+    #                  window has slid to clock. It's up to one bucket less than a window ago.
+    # ----------------------------------------------------------------------------
+
+    def windowStart(self, clock):
+        self.slide(clock)
+        return (self.latest - len(self.counts) + 1) * self.width
+
+    # ----------------------------------------------------------------------------
+    #    rate - function that returns the events per unit of clock time over the window
+    #           ending at clock
+    # ----------------------------------------------------------------------------
+
+    def rate(self, clock):
+        self.slide(clock)
+        return sum(self.counts) / self.window
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    SchedulerMetrics - online turnaround, wait, throughput and utilization of a Scheduler,
+#                       in memory that only grows with the number of processes in flight.
+#                       Completed processes are recorded from the "complete" events of the
+#                       scheduler's Instrumentation, with sink as its event sink, or passed
+#                       to record by hand. Neither keeps a reference to them. See
+#                       observeScheduler.
+#
+#
+#    @fields:   turnaround : LatencyStats   - completion time - arrival time of each process.
+#
+#               wait : LatencyStats         - arrival time - submission clock of each process
+#                                             whose submission was seen.
+#
+#               throughput : SlidingWindowCounter - completions over the last window of clock time.
+#
+#               busy : list                 - SlidingWindowCounter of the busy time of each processor
+#                                             over the last window of clock time.
+#
+#               busy_since : list           - clock at which each processor became occupied, "None"
+#                                             while vacant.
+#
+#               submitted : dict            - submission clock of each process in flight, by id.
+#
+#               instrumentation : Instrumentation - instrumentation the events come from, "None"
+#                                             until observeScheduler.
+#
+#               start_clock : float         - clock the metrics were started at.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class SchedulerMetrics:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   window : float           - throughput window in clock time
+    #
+    #               quantiles : list         - quantiles to estimate. defaults to 0.5, 0.95 and 0.99.
+    #
+    #               clock : float            - clock the metrics start at. defaults to zero.
+    #
+    #               processors : int         - number of processors to track busy time for.
+    #                                          defaults to zero.
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, window, quantiles=(0.5, 0.95, 0.99), clock=0, processors=0):
+        self.turnaround = LatencyStats(quantiles)
+        self.wait = LatencyStats(quantiles)
+        self.throughput = SlidingWindowCounter(window)
+        self.busy = [SlidingWindowCounter(window) for _ in range(processors)]
+        self.busy_since = [None] * processors
+        self.submitted = {}
+        self.instrumentation = None
+        self.start_clock = clock
+
+    # ----------------------------------------------------------------------------
+    #    record - function that adds a completed process to the metrics
+    #
+    #
+    #    @params:       process : Process       - process that completed
+    #
+    #                   submitted : float       - clock at which it was handed to the scheduler.
+    #                                             If "None", its wait isn't recorded.
+    #
+    # ----------------------------------------------------------------------------
+
+    def record(self, process, submitted=None):
+        self.turnaround.add(process.completion_time - process.arrival_time)
+        if submitted != None:
+            self.wait.add(process.arrival_time - submitted)
+        self.throughput.add(process.completion_time)
+
+    # ----------------------------------------------------------------------------
+    #    sink - Instrumentation event sink that remembers when each process was submitted,
+    #           records each process as it completes and adds up the busy time of each
+    #           processor. A process submitted before the metrics started has no wait.
+    # ----------------------------------------------------------------------------
+
+    def sink(self, event, clock, process, index):
+        if event == "submit":
+            self.submitted[id(process)] = clock
+        elif event == "attach":
+            self.busy_since[index] = clock
+        elif event == "detach":
+            self.busy[index].addSpan(self.busy_since[index], clock)
+            self.busy_since[index] = None
+        elif event == "complete":
+            self.record(process, self.submitted.pop(id(process), None))
+
+    # ----------------------------------------------------------------------------
+    #    utilization - function that returns the fraction of the last window of clock time each
+    #                  processor was occupied for. The window starts no earlier than the metrics.
+    #                  The Instrumentation's utilization is the same since it was installed.
+    #
+    #
+    #    @params:       scheduler : Scheduler   - observed scheduler
+    #
+    #    @returns:      utilization : list      - utilization of each processor between 0 and 1
+    #
+    # ----------------------------------------------------------------------------
+
+    def utilization(self, scheduler):
+        clock = scheduler.clock
+        utilization = []
+        for busy, busySince in zip(self.busy, self.busy_since):
+            start = max(busy.windowStart(clock), self.start_clock)
+            if clock <= start:
+                utilization.append(0.0)
+                continue
+            busyTime = sum(busy.counts)
+            if busySince != None:
+                busyTime = busyTime + clock - max(busySince, start)
+            utilization.append(min(busyTime / (clock - start), 1.0))
+        return utilization
+
+    # ----------------------------------------------------------------------------
+    #    summary - function that returns every metric as a dict, e.g. for a benchmark report
+    #
+    #
+    #    @params:       scheduler : Scheduler   - observed scheduler
+    #
+    #    @returns:      summary : dict
+    #
+    # ----------------------------------------------------------------------------
+
+    def summary(self, scheduler):
+        return {
+            "completed": self.turnaround.stats.count,
+            "turnaround_time": self.turnaround.summary(),
+            "turnaround_stdev": self.turnaround.stats.stdev(),
+            "wait_time": self.wait.summary(),
+            "wait_stdev": self.wait.stats.stdev(),
+            "throughput": self.throughput.rate(scheduler.clock),
+            "utilization": self.utilization(scheduler),
+        }
+
+
+# ----------------------------------------------------------------------------
+#    observeScheduler - starts collecting SchedulerMetrics for a scheduler. Instruments it
+#                       with the metrics' sink, so every process that completes through
+#                       detachProcess is recorded, with its wait if it was submitted after
+#                       this. Processors occupied at the start count as busy from the
+#                       scheduler's clock.
+#
+#
+#    @params:  scheduler : Scheduler        - scheduler to observe
+#
+#              window : float               - throughput window in clock time
+#
+#              quantiles : list             - quantiles to estimate
+#
+#    @returns - metrics : SchedulerMetrics
+# ----------------------------------------------------------------------------
+
+
+def observeScheduler(scheduler, window, quantiles=(0.5, 0.95, 0.99)):
+    metrics = SchedulerMetrics(window, quantiles, scheduler.clock, len(scheduler.pool))
+    for index, process in enumerate(scheduler.pool.current_processes):
+        if process != None:
+            metrics.busy_since[index] = scheduler.clock
+    metrics.instrumentation = scheduler.instrument(metrics.sink)
+    return metrics
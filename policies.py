@@ -0,0 +1,542 @@
+from collections import deque
+import heapq
+import math
+
+from scheduler import DEFAULT_MACHINE, ProcessorPool
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    FCFSPolicy - first come first served scheduling policy. Processes run to completion
+#                 in the order they became ready. Base class of the other policies, which
+#                 only change how the ready processes are ordered, how long a process may
+#                 run before it's sent back, and whether an arrival preempts a running process.
+#
+#
+#    @fields:   preemptive : bool       - whether a new process can take a running process's
+#                                         processor. See PolicyScheduler.preempt.
+#
+#               coalesce : bool         - whether consecutive quanta of a process can be run as
+#                                         one slice while nothing else is ready. Only safe when
+#                                         expire followed by pop hands back the same process
+#                                         with the same quantum. See PolicyScheduler.start.
+#
+#               ready : deque           - processes waiting for a processor.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class FCFSPolicy:
+
+    preemptive = False
+    coalesce = False
+
+    def __init__(self):
+        self.ready = deque()
+
+    def __len__(self):
+        return len(self.ready)
+
+    # ----------------------------------------------------------------------------
+    #    push - function that adds a process that is ready to run
+    # ----------------------------------------------------------------------------
+
+    def push(self, process):
+        self.ready.append(process)
+
+    # ----------------------------------------------------------------------------
+    #    peek - function that returns the process that should run next without removing it
+    # ----------------------------------------------------------------------------
+
+    def peek(self):
+        return self.ready[0]
+
+    # ----------------------------------------------------------------------------
+    #    pop - function that removes and returns the process that should run next
+    # ----------------------------------------------------------------------------
+
+    def pop(self):
+        return self.ready.popleft()
+
+    # ----------------------------------------------------------------------------
+    #    getQuantum - function that returns how long a process that was just popped may run
+    #                 before it's sent back to the policy. "None" lets it run to completion.
+    #
+    #
+    #    @params:       process : Process       - process about to run
+    #
+    #                   clock_speed : float     - clock speed of the processor it's about to run on
+    #
+    #    @returns:      quantum : float         - time slice in seconds
+    #
+    # ----------------------------------------------------------------------------
+
+    def getQuantum(self, process, clock_speed):
+        return None
+
+    # ----------------------------------------------------------------------------
+    #    expire - function called when a process used up its quantum or was preempted
+    #             without completing
+    # ----------------------------------------------------------------------------
+
+    def expire(self, process):
+        self.push(process)
+
+    # ----------------------------------------------------------------------------
+    #    finish - function called when a process completes
+    # ----------------------------------------------------------------------------
+
+    def finish(self, process):
+        pass
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    SJFPolicy - shortest job first. The ready process with the smallest burst time runs
+#                next, ties in order of arrival. Backed by a heap.
+#
+#
+#    @fields:   ready : list            - heap of (priority, order, process) entries.
+#
+#               count : int             - number of processes pushed so far.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class SJFPolicy(FCFSPolicy):
+    def __init__(self):
+        self.ready = []
+        self.count = 0
+
+    def priority(self, process):
+        return process.burst_time
+
+    def push(self, process):
+        heapq.heappush(self.ready, (self.priority(process), self.count, process))
+        self.count = self.count + 1
+
+    def peek(self):
+        return self.ready[0][2]
+
+    def pop(self):
+        return heapq.heappop(self.ready)[2]
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    SRTFPolicy - shortest remaining time first. Like SJFPolicy but ordered by remaining
+#                 cycles, and a new process preempts the running process with the most
+#                 remaining cycles if it has fewer.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class SRTFPolicy(SJFPolicy):
+
+    preemptive = True
+
+    def priority(self, process):
+        return process.remaining_cycles
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    RoundRobinPolicy - first come first served, but a process may only run for one
+#                       quantum before it goes to the back of the queue. While no other
+#                       process is waiting the quanta of a running process are coalesced,
+#                       so a long job alone on a processor costs one event, not one per quantum.
+#
+#
+#    @fields:   quantum : float         - time slice in seconds, or in cpu cycles if cycles is set.
+#
+#               cycles : bool           - whether the quantum is in cpu cycles. Each processor then
+#                                         gets a time slice of quantum / clock_speed seconds, so a
+#                                         slice does the same amount of work on every processor.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class RoundRobinPolicy(FCFSPolicy):
+
+    coalesce = True
+
+    def __init__(self, quantum, cycles=False):
+        FCFSPolicy.__init__(self)
+        self.quantum = quantum
+        self.cycles = cycles
+
+    def getQuantum(self, process, clock_speed):
+        if self.cycles:
+            return self.quantum / clock_speed
+        return self.quantum
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    MLFQPolicy - multi-level feedback queue. New processes start in the top level. A
+#                 process that uses up its quantum drops one level, and lower levels
+#                 have longer quanta. The first process of the highest non-empty level
+#                 runs next. Each level is a deque.
+#
+#
+#    @fields:   quanta : list           - time slice of each level in seconds. "None" for the
+#                                         last level runs processes to completion.
+#
+#               levels : list           - deque of ready processes per level.
+#
+#               running : dict          - level of each running process, by id.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class MLFQPolicy(FCFSPolicy):
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   quanta : list           - time slice of each level. defaults to three
+    #                                         levels of 0.1s, 1s and run to completion.
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, quanta=(0.1, 1.0, None)):
+        self.quanta = list(quanta)
+        self.levels = [deque() for quantum in self.quanta]
+        self.running = {}
+        self.count = 0
+
+    def __len__(self):
+        return self.count
+
+    def push(self, process, level=0):
+        self.levels[level].append(process)
+        self.count = self.count + 1
+
+    def peek(self):
+        for level in self.levels:
+            if level:
+                return level[0]
+        raise IndexError("peek from an empty policy")
+
+    def pop(self):
+        for number, level in enumerate(self.levels):
+            if level:
+                self.count = self.count - 1
+                process = level.popleft()
+                self.running[id(process)] = number
+                return process
+        raise IndexError("pop from an empty policy")
+
+    def getQuantum(self, process, clock_speed):
+        return self.quanta[self.running[id(process)]]
+
+    def expire(self, process):
+        level = self.running.pop(id(process))
+        self.push(process, min(level + 1, len(self.levels) - 1))
+
+    def finish(self, process):
+        self.running.pop(id(process), None)
+
+
+# ---------------------/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\----------------------
+#
+#    PolicyScheduler - discrete event core shared by every policy. The policy decides which
+#                      ready process runs next and for how long, the core keeps the clock,
+#                      places processes on a vacant processor with enough memory and
+#                      processes completions, quantum expiries and arrivals in time order.
+#                      The vacant processor is chosen by the pool's placement policy.
+#
+#                      Time is in seconds. A process runs for remaining_cycles / clock_speed
+#                      seconds on a processor, and its remaining_cycles is brought up to date,
+#                      in whole cycles, when it leaves the processor.
+#                      arrival_time is the clock at which it first starts executing, as
+#                      with Scheduler.
+#
+#
+#    @fields:   policy : FCFSPolicy         - scheduling policy.
+#
+#               clock : float               - current time.
+#
+#               pool : ProcessorPool        - processors on the system.
+#
+#               max_memory : int            - memory of the largest processor.
+#
+#               started : list              - clock at which the current slice of each processor began.
+#
+#               slice_ends : list           - clock at which the current slice of each processor ends.
+#
+#               completes : list            - whether the current slice of each processor runs its
+#                                             process to completion.
+#
+#               quanta : list               - quantum of each processor whose current slice is several
+#                                             coalesced quanta, "None" otherwise. See splitSlices.
+#
+#               versions : list             - bumped whenever a processor's slice changes. Events
+#                                             of an older version are stale.
+#
+#               events : list               - heap of (time, index, version) slice ends.
+#
+#               arrivals : iterator         - stream of (timestamp, Process) pairs still to arrive.
+#
+#               next_arrival : tuple        - next pair of the stream, "None" once exhausted.
+#
+#               event_count : int           - number of slice ends processed.
+#
+# ---------------------\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/----------------------
+
+
+class PolicyScheduler:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   policy : FCFSPolicy      - scheduling policy
+    #
+    #               processes : list         - processes ready at time zero
+    #
+    #               machine : list           - list of Processor describing the system.
+    #                                          defaults to DEFAULT_MACHINE.
+    #
+    #               arrivals : iterable      - stream of (timestamp, Process) pairs
+    #
+    #               placement : str          - placement policy. defaults to "first".
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(
+        self,
+        policy,
+        processes=None,
+        machine=DEFAULT_MACHINE,
+        arrivals=None,
+        placement="first",
+    ):
+        self.policy = policy
+        self.clock = 0.0
+        self.pool = ProcessorPool(machine, placement)
+        self.max_memory = max(self.pool.memory, default=0)
+        self.started = [0.0] * len(self.pool)
+        self.slice_ends = [0.0] * len(self.pool)
+        self.completes = [False] * len(self.pool)
+        self.quanta = [None] * len(self.pool)
+        self.versions = [0] * len(self.pool)
+        self.events = []
+        self.arrivals = iter(())
+        self.next_arrival = None
+        self.event_count = 0
+        if processes != None:
+            for process in processes:
+                self.submit(process)
+        if arrivals != None:
+            self.arrivals = iter(arrivals)
+            self.next_arrival = next(self.arrivals, None)
+
+    # ----------------------------------------------------------------------------
+    #    submit - function that hands a process to the policy and starts it if it can run
+    #
+    #
+    #    @params:       process : Process       - process that is ready to run
+    #
+    # ----------------------------------------------------------------------------
+
+    def submit(self, process):
+        if process.memory_footprint > self.max_memory:
+            raise ValueError(
+                "process %d needs more memory than any processor has" % process.PID
+            )
+        self.policy.push(process)
+        self.dispatch()
+        if self.policy.preemptive and len(self.policy):
+            self.preempt()
+        if len(self.policy):
+            self.splitSlices()
+
+    # ----------------------------------------------------------------------------
+    #    dispatch - function that starts ready processes on vacant processors. Stops at the
+    #               first process that doesn't fit on any vacant processor, so a process
+    #               needing a large processor isn't overtaken indefinitely.
+    # ----------------------------------------------------------------------------
+
+    def dispatch(self):
+        while len(self.policy) and self.pool.free_memory[1] != -1:
+            index = self.pool.findFreeProcessor(self.policy.peek().memory_footprint)
+            if index == -1:
+                break
+            self.start(index, self.policy.pop())
+
+    # ----------------------------------------------------------------------------
+    #    preempt - function that gives the next ready process the processor of the running
+    #              process with the most remaining cycles, if the ready process has fewer
+    #              and fits in its memory
+    # ----------------------------------------------------------------------------
+
+    def preempt(self):
+        process = self.policy.peek()
+        victim = -1
+        mostRemaining = process.remaining_cycles
+        for index in range(len(self.pool)):
+            if (
+                self.pool.current_processes[index] != None
+                and self.pool.memory[index] >= process.memory_footprint
+            ):
+                remaining = self.getRemainingCycles(index)
+                if remaining > mostRemaining:
+                    mostRemaining = remaining
+                    victim = index
+        if victim == -1:
+            return
+        preempted = self.stop(victim)
+        self.start(victim, self.policy.pop())
+        self.policy.expire(preempted)
+
+    # ----------------------------------------------------------------------------
+    #    getRemainingCycles - helper function that returns the remaining cycles of the process
+    #                         on a processor at the current clock
+    # ----------------------------------------------------------------------------
+
+    def getRemainingCycles(self, index):
+        process = self.pool.current_processes[index]
+        ran = (self.clock - self.started[index]) * self.pool.clock_speeds[index]
+        return max(process.remaining_cycles - ran, 0)
+
+    # ----------------------------------------------------------------------------
+    #    start - helper function that runs a process on a vacant processor for one slice.
+    #            If the policy coalesces quanta and no other process is ready, the slice
+    #            runs the process to completion instead of for one quantum. splitSlices
+    #            cuts it back to a quantum boundary as soon as another process is ready.
+    #
+    #
+    #    @params:       index : int             - index of the processor
+    #
+    #                   process : Process       - process to run, just popped from the policy
+    #
+    # ----------------------------------------------------------------------------
+
+    def start(self, index, process):
+        if process.arrival_time == -1:
+            process.arrival_time = self.clock
+        clock_speed = self.pool.clock_speeds[index]
+        runtime = process.remaining_cycles / clock_speed
+        quantum = self.policy.getQuantum(process, clock_speed)
+        self.completes[index] = quantum == None or runtime <= quantum
+        self.quanta[index] = None
+        if not self.completes[index] and self.policy.coalesce and not len(self.policy):
+            self.completes[index] = True
+            self.quanta[index] = quantum
+        self.slice_ends[index] = self.clock + (
+            runtime if self.completes[index] else quantum
+        )
+        self.started[index] = self.clock
+        self.versions[index] = self.versions[index] + 1
+        self.pool.setProcess(index, process)
+        heapq.heappush(
+            self.events, (self.slice_ends[index], index, self.versions[index])
+        )
+
+    # ----------------------------------------------------------------------------
+    #    splitSlices - helper function that ends every coalesced slice at its next quantum
+    #                  boundary after the clock, as if each quantum had been its own slice.
+    #                  Called whenever a process is left waiting in the policy.
+    # ----------------------------------------------------------------------------
+
+    def splitSlices(self):
+        for index in range(len(self.pool)):
+            quantum = self.quanta[index]
+            if quantum == None:
+                continue
+            self.quanta[index] = None
+            boundary = self.started[index] + quantum * (
+                math.floor((self.clock - self.started[index]) / quantum) + 1
+            )
+            if boundary < self.slice_ends[index]:
+                self.slice_ends[index] = boundary
+                self.completes[index] = False
+                self.versions[index] = self.versions[index] + 1
+                heapq.heappush(self.events, (boundary, index, self.versions[index]))
+
+    # ----------------------------------------------------------------------------
+    #    stop - helper function that takes the process off a processor at the current clock
+    #           and records the cycles it has left
+    #
+    #
+    #    @params:       index : int             - index of the processor
+    #
+    #    @returns:      process : Process       - process that was running
+    #
+    # ----------------------------------------------------------------------------
+
+    def stop(self, index):
+        process = self.pool.current_processes[index]
+        process.remaining_cycles = round(self.getRemainingCycles(index))
+        self.versions[index] = self.versions[index] + 1
+        self.pool.setProcess(index, None)
+        return process
+
+    # ----------------------------------------------------------------------------
+    #    getNextEvent - helper function that returns the index of the processor whose slice
+    #                   ends first. Stale events are discarded on the way.
+    #
+    #
+    #    @returns:      index : int             - "None" if every processor is vacant
+    #
+    # ----------------------------------------------------------------------------
+
+    def getNextEvent(self):
+        while self.events:
+            time, index, version = self.events[0]
+            if self.versions[index] == version:
+                return index
+            heapq.heappop(self.events)
+        return None
+
+    # ----------------------------------------------------------------------------
+    #    detachProcess - function that advances the simulation to the next process completion.
+    #                    Arrivals and quantum expiries before it are processed on the way.
+    #
+    #
+    #    @returns:      endingProcess : Process     - process that completed. Returns "None" if
+    #                                                 every processor is vacant and the stream
+    #                                                 is exhausted.
+    #
+    # ----------------------------------------------------------------------------
+
+    def detachProcess(self):
+        while True:
+            index = self.getNextEvent()
+            if self.next_arrival != None and (
+                index == None or self.next_arrival[0] < self.slice_ends[index]
+            ):
+                timestamp, process = self.next_arrival
+                self.next_arrival = next(self.arrivals, None)
+                self.clock = max(self.clock, timestamp)
+                self.submit(process)
+                continue
+            if index == None:
+                return None
+
+            heapq.heappop(self.events)
+            self.clock = self.slice_ends[index]
+            self.event_count = self.event_count + 1
+            completed = self.completes[index]
+            process = self.stop(index)
+            if completed:
+                process.remaining_cycles = 0
+                process.completion_time = self.clock
+                self.policy.finish(process)
+                self.dispatch()
+                return process
+            self.policy.expire(process)
+            if len(self.policy) == 1:
+                ## nothing else is ready, it keeps its processor
+                self.start(index, self.policy.pop())
+            else:
+                self.dispatch()
+
+
+POLICIES = {
+    "fcfs": FCFSPolicy,
+    "sjf": SJFPolicy,
+    "srtf": SRTFPolicy,
+    "rr": lambda: RoundRobinPolicy(1.0),
+    "mlfq": MLFQPolicy,
+}
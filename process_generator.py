@@ -20,6 +20,30 @@ def generateProcess():
     return Process(generatePID(), burstTime, burstTime, generateMemFootprint(), -1, -1)
 
 
+# ----------------------------------------------------------------------------
+#    generateArrivals - generator of new processes arriving at random. Time between
+#                       arrivals is exponentially distributed. Meant to be streamed into
+#                       a Scheduler, which only pulls the next process when it arrives.
+#
+#
+#    @params:  rate : float      - average number of arrivals per unit of clock time
+#
+#              count : int       - number of processes to generate. defaults to "None",
+#                                  in which case the generator never ends.
+#
+#    @returns - (arrival timestamp, new Process object) pairs : generator
+# ----------------------------------------------------------------------------
+
+
+def generateArrivals(rate, count=None):
+    timestamp = 0
+    while count == None or count > 0:
+        timestamp = timestamp + random.expovariate(rate)
+        yield (timestamp, generateProcess())
+        if count != None:
+            count = count - 1
+
+
 # ----------------------------------------------------------------------------
 #    generatePID - generates a process ID based on the number of second since
 #                  midnight times a random number between 1-100
@@ -60,3 +84,29 @@ def generateBurstTimeCycles():
 
 def generateMemFootprint():
     return random.randint(1, 16384)
+
+
+# ----------------------------------------------------------------------------
+#    generateProcesses - generates a batch of new processes in one vectorized pass.
+#                        Burst times and memory footprints follow the same distributions
+#                        as generateBurstTimeCycles and generateMemFootprint. Process IDs
+#                        are drawn without replacement, so they never collide. Needs NumPy.
+#
+#
+#    @params:  n : int           - number of processes to generate
+#
+#              seed : int        - seed for the random number generator. defaults to "None",
+#                                  in which case a fresh seed is used.
+#
+#    @returns - new Workload of n processes : Workload
+# ----------------------------------------------------------------------------
+
+
+def generateProcesses(n, seed=None):
+    import numpy as np
+    from batch_engine import Workload
+
+    rng = np.random.default_rng(seed)
+    PIDs = rng.choice(2**31 - 1, size=n, replace=False) + 1
+    burstTimes = (rng.random(n) * 10.0 ** rng.integers(6, 13, size=n)).astype(np.int64)
+    return Workload(PIDs, burstTimes, rng.integers(1, 16385, size=n))
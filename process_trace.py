@@ -0,0 +1,273 @@
+import csv
+import json
+import os
+import struct
+
+import numpy as np
+
+from batch_engine import Workload
+from scheduler import Process
+
+
+# ----------------------------------------------------------------------------
+#    Binary trace format - a 32 byte header followed by fixed size little-endian records,
+#                          one per process arrival, in order of timestamp.
+#
+#    header:   magic : 8 bytes          - b"SCHEDTRC"
+#              version : uint32         - TRACE_VERSION
+#              record size : uint32     - size of a record in bytes
+#              count : uint64           - number of records
+#              reserved : 8 bytes
+#
+#    record:   timestamp : float64      - clock at which the process arrives
+#              PID : int64
+#              burst_time : int64       - cpu cycles
+#              memory_footprint : int64 - MB
+# ----------------------------------------------------------------------------
+
+TRACE_MAGIC = b"SCHEDTRC"
+TRACE_VERSION = 1
+TRACE_HEADER = struct.Struct("<8sIIQ8x")
+TRACE_RECORD = np.dtype(
+    [
+        ("timestamp", "<f8"),
+        ("PID", "<i8"),
+        ("burst_time", "<i8"),
+        ("memory_footprint", "<i8"),
+    ]
+)
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    TraceWriter - writes a binary trace one batch of records at a time, so traces
+#                  larger than memory can be produced. The record count in the header
+#                  is filled in when the writer is closed.
+#
+#
+#    @fields:   file : file             - trace file being written
+#
+#               count : int             - number of records written so far
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class TraceWriter:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   path : str              - trace file to create
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, path):
+        self.file = open(path, "wb")
+        self.count = 0
+        self.file.write(
+            TRACE_HEADER.pack(TRACE_MAGIC, TRACE_VERSION, TRACE_RECORD.itemsize, 0)
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ----------------------------------------------------------------------------
+    #    write - function that appends a batch of arrivals to the trace
+    #
+    #
+    #    @params:   timestamps : array-like        - arrival clock of each process
+    #
+    #               PID : array-like               - process IDs
+    #
+    #               burst_time : array-like        - burst times in cpu cycles
+    #
+    #               memory_footprint : array-like  - memory footprints in MB
+    #
+    # ----------------------------------------------------------------------------
+
+    def write(self, timestamps, PID, burst_time, memory_footprint):
+        records = np.empty(len(PID), dtype=TRACE_RECORD)
+        records["timestamp"] = timestamps
+        records["PID"] = PID
+        records["burst_time"] = burst_time
+        records["memory_footprint"] = memory_footprint
+        self.file.write(records.tobytes())
+        self.count = self.count + len(records)
+
+    # ----------------------------------------------------------------------------
+    #    writeWorkload - function that appends every process of a workload to the trace
+    #
+    #
+    #    @params:   workload : Workload            - processes to write
+    #
+    #               timestamps : array-like        - arrival clock of each process. defaults
+    #                                                to every process arriving at zero.
+    #
+    # ----------------------------------------------------------------------------
+
+    def writeWorkload(self, workload, timestamps=None):
+        if timestamps is None:  ## may be an array, so not "== None"
+            timestamps = np.zeros(len(workload))
+        self.write(
+            timestamps, workload.PID, workload.burst_time, workload.memory_footprint
+        )
+
+    def close(self):
+        if self.file.closed:
+            return
+        self.file.seek(0)
+        self.file.write(
+            TRACE_HEADER.pack(
+                TRACE_MAGIC, TRACE_VERSION, TRACE_RECORD.itemsize, self.count
+            )
+        )
+        self.file.close()
+
+
+# ----------------------------------------------------------------------------
+#    writeTrace - writes a workload to a new binary trace
+#
+#
+#    @params:  path : str                    - trace file to create
+#
+#              workload : Workload           - processes to write
+#
+#              timestamps : array-like       - arrival clock of each process. defaults to
+#                                              every process arriving at zero.
+# ----------------------------------------------------------------------------
+
+
+def writeTrace(path, workload, timestamps=None):
+    with TraceWriter(path) as writer:
+        writer.writeWorkload(workload, timestamps)
+
+
+# ----------------------------------------------------------------------------
+#    readTrace - maps a binary trace into memory without reading it. Records are only
+#                paged in as they're accessed, so multi-GB traces open instantly.
+#
+#
+#    @params:  path : str                    - trace file to open
+#
+#    @returns - records : numpy.memmap       - read-only structured array of TRACE_RECORD
+# ----------------------------------------------------------------------------
+
+
+def readTrace(path):
+    with open(path, "rb") as file:
+        header = file.read(TRACE_HEADER.size)
+    if len(header) < TRACE_HEADER.size:
+        raise ValueError("%s is not a process trace" % path)
+    magic, version, recordSize, count = TRACE_HEADER.unpack(header)
+    if magic != TRACE_MAGIC:
+        raise ValueError("%s is not a process trace" % path)
+    if version != TRACE_VERSION or recordSize != TRACE_RECORD.itemsize:
+        raise ValueError("%s uses unsupported trace version %d" % (path, version))
+    if count == 0:
+        return np.empty(0, dtype=TRACE_RECORD)
+    return np.memmap(
+        path, dtype=TRACE_RECORD, mode="r", offset=TRACE_HEADER.size, shape=(count,)
+    )
+
+
+# ----------------------------------------------------------------------------
+#    traceWorkload - returns the processes of a trace as a Workload for Scheduler.run.
+#                    The PID, burst_time and memory_footprint columns are views of the
+#                    mapped records, not copies, and Scheduler.run doesn't copy them either.
+#                    Scheduler.run starts every process at once, so a trace whose processes
+#                    arrive over time has to be streamed with replayTrace instead.
+#
+#
+#    @params:  records : ndarray             - records returned by readTrace
+#
+#              batch : int                   - records checked for a timestamp at a time.
+#                                              defaults to 65536.
+#
+#    @returns - workload : Workload
+# ----------------------------------------------------------------------------
+
+
+def traceWorkload(records, batch=65536):
+    for start in range(0, len(records), batch):
+        if records["timestamp"][start : start + batch].any():
+            raise ValueError(
+                "trace has arrival timestamps, replay it with replayTrace instead"
+            )
+    return Workload(records["PID"], records["burst_time"], records["memory_footprint"])
+
+
+# ----------------------------------------------------------------------------
+#    replayTrace - generator of (timestamp, Process) pairs to stream a trace into a
+#                  Scheduler. Process objects are only created as the scheduler pulls
+#                  them, a batch of records at a time.
+#
+#
+#    @params:  path : str                    - trace file to replay
+#
+#              batch : int                   - records converted at a time. defaults to 65536.
+#
+#    @returns - arrivals : generator
+# ----------------------------------------------------------------------------
+
+
+def replayTrace(path, batch=65536):
+    records = readTrace(path)
+    for start in range(0, len(records), batch):
+        chunk = records[start : start + batch]
+        for timestamp, PID, burstTime, memoryFootprint in zip(
+            chunk["timestamp"].tolist(),
+            chunk["PID"].tolist(),
+            chunk["burst_time"].tolist(),
+            chunk["memory_footprint"].tolist(),
+        ):
+            yield (
+                timestamp,
+                Process(PID, burstTime, burstTime, memoryFootprint, -1, -1),
+            )
+
+
+# ----------------------------------------------------------------------------
+#    convertJobLog - converts a CSV or JSONL job log into a binary trace. CSV logs need a
+#                    header row. Each job needs burst_time and memory_footprint; timestamp
+#                    defaults to zero and PID to the job's row number, counting the first
+#                    job as zero. The log is converted a batch at a time, so it never has
+#                    to fit in memory.
+#
+#
+#    @params:  source : str                  - job log, ending in .csv or .jsonl
+#
+#              destination : str             - trace file to create
+#
+#              batch : int                   - jobs converted at a time. defaults to 65536.
+#
+#    @returns - count : int                  - number of jobs converted
+# ----------------------------------------------------------------------------
+
+
+def convertJobLog(source, destination, batch=65536):
+    extension = os.path.splitext(source)[1].lower()
+    if extension not in (".csv", ".jsonl"):
+        raise ValueError("unsupported job log format %s" % extension)
+
+    with open(source, newline="") as log, TraceWriter(destination) as writer:
+        if extension == ".csv":
+            jobs = csv.DictReader(log)
+        else:
+            jobs = (json.loads(line) for line in log if line.strip())
+
+        columns = ([], [], [], [])
+        for number, job in enumerate(jobs):
+            columns[0].append(float(job.get("timestamp") or 0))
+            PID = job.get("PID")
+            columns[1].append(int(PID) if PID not in (None, "") else number)
+            columns[2].append(int(job["burst_time"]))
+            columns[3].append(int(job["memory_footprint"]))
+            if len(columns[0]) == batch:
+                writer.write(*columns)
+                columns = ([], [], [], [])
+        if columns[0]:
+            writer.write(*columns)
+        return writer.count
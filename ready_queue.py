@@ -0,0 +1,140 @@
+from collections import deque
+import heapq
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    ReadyQueue - first come first served queue of processes waiting for a processor
+#                 to become vacant. Backed by a deque so both ends cost O(1).
+#
+#
+#    @fields:   processes : deque       - waiting processes, front of the queue first.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class ReadyQueue:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   processes : list        - processes to queue, in order. defaults to empty.
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, processes=()):
+        self.processes = deque(processes)
+
+    def __len__(self):
+        return len(self.processes)
+
+    def __iter__(self):
+        return iter(self.processes)
+
+    # ----------------------------------------------------------------------------
+    #    push - function that adds a process to the back of the queue
+    #
+    #
+    #    @params:       process : Process       - process to queue
+    #
+    # ----------------------------------------------------------------------------
+
+    def push(self, process):
+        self.processes.append(process)
+
+    # ----------------------------------------------------------------------------
+    #    pop - function that removes the process at the front of the queue
+    #
+    #
+    #    @returns:      process : Process       - process at the front of the queue
+    #
+    # ----------------------------------------------------------------------------
+
+    def pop(self):
+        return self.processes.popleft()
+
+    # ----------------------------------------------------------------------------
+    #    peek - function that returns the process at the front of the queue without removing it
+    #
+    #
+    #    @returns:      process : Process       - process at the front of the queue
+    #
+    # ----------------------------------------------------------------------------
+
+    def peek(self):
+        return self.processes[0]
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    PriorityReadyQueue - queue of processes waiting for a processor where the process with
+#                         the lowest priority value is at the front. Processes with the same
+#                         priority are served first come first served. Backed by a heap so
+#                         push and pop cost O(log n).
+#
+#
+#    @fields:   priority : function     - returns the priority value of a process. It's evaluated
+#                                         once, when the process is pushed.
+#
+#               processes : list        - heap of (priority, order, process) entries.
+#
+#               count : int             - number of processes pushed so far. Used as the order
+#                                         of the next process to break ties.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+class PriorityReadyQueue(ReadyQueue):
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   priority : function     - priority of a process. defaults to burstTimePriority.
+    #
+    #               processes : list        - processes to queue. defaults to empty.
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, priority=None, processes=()):
+        self.priority = priority if priority != None else burstTimePriority
+        self.processes = []
+        self.count = 0
+        for process in processes:
+            self.push(process)
+
+    def __iter__(self):
+        return (entry[2] for entry in sorted(self.processes))
+
+    def push(self, process):
+        heapq.heappush(self.processes, (self.priority(process), self.count, process))
+        self.count = self.count + 1
+
+    def pop(self):
+        return heapq.heappop(self.processes)[2]
+
+    def peek(self):
+        return self.processes[0][2]
+
+
+# ----------------------------------------------------------------------------
+#    burstTimePriority - priority of a process by burst time, shortest job first
+#
+#
+#    @returns - burst time of the process : int
+# ----------------------------------------------------------------------------
+
+
+def burstTimePriority(process):
+    return process.burst_time
+
+
+# ----------------------------------------------------------------------------
+#    memoryFootprintPriority - priority of a process by memory footprint, smallest first
+#
+#
+#    @returns - memory footprint of the process : int
+# ----------------------------------------------------------------------------
+
+
+def memoryFootprintPriority(process):
+    return process.memory_footprint
@@ -0,0 +1,268 @@
+import asyncio
+
+from scheduler import Scheduler
+
+
+# ---------------------/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\----------------------
+#
+#    RealTimeScheduler - asyncio front end that runs a Scheduler as a live dispatcher. The
+#                        scheduler's clock follows the event loop's clock, scaled, and each
+#                        submitted process gets a future that's resolved when it completes.
+#
+#                        The scheduler clock isn't in seconds. A process of C cycles alone on a
+#                        processor of clock speed f advances it by C / f², and every class clock
+#                        is the clock times its clock speed. The dispatcher converts the clock to
+#                        simulated seconds on the slowest processors, clock * slowest clock speed,
+#                        before scaling it. On a machine with one clock speed that's exactly how
+#                        long the processes take, e.g. 500 seconds for 10^12 cycles at 2 GHz.
+#
+#                        Submissions aren't attached one at a time. They're buffered and
+#                        admitted together once per event loop tick, after completions up to
+#                        the current time have been detached. A timer is kept for the next
+#                        completion only, so an idle dispatcher costs nothing.
+#
+#                        Needs a scheduler without a process interval or arrival stream.
+#
+#
+#    @fields:   scheduler : Scheduler       - scheduler making the decisions.
+#
+#               scale : float               - simulated seconds per second of wall-clock time.
+#
+#               clock_speed : float         - slowest clock speed of the machine, the simulated seconds
+#                                             per unit of scheduler clock.
+#
+#               pending : list              - (process, future) pairs waiting to be admitted.
+#
+#               futures : dict              - future of each admitted process, by id.
+#
+#               loop : AbstractEventLoop    - event loop the dispatcher runs on, set by the first
+#                                             submission.
+#
+#               wall_start : float          - loop time the scheduler clock is measured from.
+#
+#               clock_start : float         - scheduler clock at wall_start.
+#
+#               timer : TimerHandle         - timer for the next completion, "None" if there isn't one.
+#
+#               timer_clock : float         - scheduler clock the timer was set for.
+#
+#               admission : Handle          - callback admitting the pending processes, "None" if
+#                                             nothing is pending.
+#
+#               batches : int               - number of admission batches.
+#
+#               largest_batch : int         - most processes admitted in one batch.
+#
+# ---------------------\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/----------------------
+
+
+class RealTimeScheduler:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   scheduler : Scheduler    - scheduler to drive. defaults to a new Scheduler().
+    #
+    #               scale : float            - simulated seconds per second of wall-clock time.
+    #                                          defaults to 1, real time.
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, scheduler=None, scale=1.0):
+        self.scheduler = scheduler if scheduler != None else Scheduler()
+        if self.scheduler.process_interval != 0:
+            raise ValueError(
+                "real time mode needs a Scheduler without a process interval"
+            )
+        if self.scheduler.next_arrival != None:
+            raise ValueError(
+                "real time mode needs a Scheduler without an arrival stream"
+            )
+        if scale <= 0:
+            raise ValueError("scale must be positive")
+        self.scale = scale
+        self.clock_speed = min(self.scheduler.pool.clock_speeds, default=1.0)
+        self.max_memory = max(self.scheduler.pool.memory, default=0)
+        self.pending = []
+        self.futures = {}
+        self.loop = None
+        self.wall_start = 0.0
+        self.clock_start = 0.0
+        self.timer = None
+        self.timer_clock = 0.0
+        self.admission = None
+        self.batches = 0
+        self.largest_batch = 0
+
+    # ----------------------------------------------------------------------------
+    #    now - function that returns the current time on the scheduler clock
+    # ----------------------------------------------------------------------------
+
+    def now(self):
+        return (
+            self.clock_start
+            + (self.loop.time() - self.wall_start) * self.scale / self.clock_speed
+        )
+
+    # ----------------------------------------------------------------------------
+    #    submit - function that hands a process to the dispatcher. It's admitted with the
+    #             rest of this event loop tick's submissions. Must be called from the
+    #             event loop's thread, e.g. from a coroutine.
+    #
+    #
+    #    @params:       process : Process       - new process
+    #
+    #    @returns:      future : Future         - resolved with the process once it completes. Fails
+    #                                             with ValueError if no processor has enough memory.
+    #                                             Cancelling it stops the dispatcher waiting for the
+    #                                             process, which still runs to completion.
+    #
+    # ----------------------------------------------------------------------------
+
+    def submit(self, process):
+        if self.loop == None:
+            self.loop = asyncio.get_running_loop()
+            self.wall_start = self.loop.time()
+            self.clock_start = self.scheduler.clock
+        future = self.loop.create_future()
+        if process.memory_footprint > self.max_memory:
+            future.set_exception(
+                ValueError(
+                    "process %d needs more memory than any processor has" % process.PID
+                )
+            )
+            return future
+        self.pending.append((process, future))
+        if self.admission == None:
+            self.admission = self.loop.call_soon(self.admit)
+        return future
+
+    # ----------------------------------------------------------------------------
+    #    serveQueue - coroutine that submits every process put on an asyncio.Queue until it
+    #                 gets "None". Stands in for a socket or any other source of jobs.
+    #
+    #
+    #    @params:       queue : Queue           - queue of processes
+    #
+    # ----------------------------------------------------------------------------
+
+    async def serveQueue(self, queue):
+        while True:
+            process = await queue.get()
+            if process == None:
+                return
+            self.submit(process)
+
+    # ----------------------------------------------------------------------------
+    #    join - coroutine that waits until every submitted process has completed
+    # ----------------------------------------------------------------------------
+
+    async def join(self):
+        while self.pending or self.futures:
+            futures = [future for process, future in self.pending if not future.done()]
+            futures.extend(
+                future for future in self.futures.values() if not future.done()
+            )
+            if futures:
+                await asyncio.wait(futures)
+            else:
+                await asyncio.sleep(0)  ## let cancelled submissions be dropped
+
+    # ----------------------------------------------------------------------------
+    #    close - function that stops the dispatcher. Futures of processes that haven't
+    #            completed are cancelled.
+    # ----------------------------------------------------------------------------
+
+    def close(self):
+        if self.timer != None:
+            self.timer.cancel()
+            self.timer = None
+        if self.admission != None:
+            self.admission.cancel()
+            self.admission = None
+        for process, future in self.pending:
+            future.cancel()
+        for future in self.futures.values():
+            future.cancel()
+        self.pending = []
+        self.futures = {}
+
+    # ----------------------------------------------------------------------------
+    #    admit - helper function that attaches the processes submitted during the last tick
+    # ----------------------------------------------------------------------------
+
+    def admit(self):
+        self.admission = None
+        self.completeUntil(self.now())
+        batch = self.pending
+        self.pending = []
+        for process, future in batch:
+            if future.cancelled():
+                continue
+            self.futures[id(process)] = future
+            future.add_done_callback(
+                lambda future, key=id(process): self.forget(key, future)
+            )
+            self.scheduler.submitProcess(process)
+        self.batches = self.batches + 1
+        if len(batch) > self.largest_batch:
+            self.largest_batch = len(batch)
+        self.setTimer()
+
+    # ----------------------------------------------------------------------------
+    #    forget - helper function called when the future of an admitted process is done. A
+    #             cancelled one is dropped, so join stops waiting for its process.
+    # ----------------------------------------------------------------------------
+
+    def forget(self, key, future):
+        if future.cancelled() and self.futures.get(key) is future:
+            del self.futures[key]
+
+    # ----------------------------------------------------------------------------
+    #    expire - helper function called by the timer when the next process is due to complete
+    # ----------------------------------------------------------------------------
+
+    def expire(self):
+        self.timer = None
+        self.completeUntil(max(self.now(), self.timer_clock))
+        self.setTimer()
+
+    # ----------------------------------------------------------------------------
+    #    completeUntil - helper function that detaches every process completing up to a time,
+    #                    resolves their futures, then moves the scheduler clock forward to it
+    #
+    #
+    #    @params:       clock : float           - time on the scheduler clock
+    #
+    # ----------------------------------------------------------------------------
+
+    def completeUntil(self, clock):
+        scheduler = self.scheduler
+        while True:
+            finish = scheduler.getNextCompletionTime()
+            if finish == None or finish > clock:
+                break
+            process = scheduler.detachProcess()
+            future = self.futures.pop(id(process), None)
+            if future != None and not future.done():
+                future.set_result(process)
+        if scheduler.clock < clock:
+            scheduler.advanceClock(clock - scheduler.clock)
+
+    # ----------------------------------------------------------------------------
+    #    setTimer - helper function that sets the timer for the next completion
+    # ----------------------------------------------------------------------------
+
+    def setTimer(self):
+        if self.timer != None:
+            self.timer.cancel()
+            self.timer = None
+        finish = self.scheduler.getNextCompletionTime()
+        if finish == None:
+            return
+        self.timer_clock = finish
+        self.timer = self.loop.call_at(
+            self.wall_start
+            + (finish - self.clock_start) * self.clock_speed / self.scale,
+            self.expire,
+        )
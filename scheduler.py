@@ -1,44 +1,114 @@
-from dataclasses import dataclass
+from array import array
+import heapq
+
+from ready_queue import ReadyQueue
 
 
 # -----------------------------------/\/\/\---------------------------------------
 #
-#    Process - dataclass stucture representing a running process on the system
+#    Process - stucture representing a running process on the system. Uses __slots__,
+#              so a process carries no __dict__. Written out rather than declared as a
+#              dataclass so importing the scheduler doesn't load the dataclasses module,
+#              which dominates the start up time of short runs. For batches of millions
+#              of processes, use batch_engine.Workload, which stores the same fields as
+#              int64/float64 columns.
 #
 #
-#    @fields:   PID : int               - the process's ID
+#    @fields:   PID : int                 - the process's ID
 #
-#               burst_time : int        - require number of cpu cycles a process
-#                                         needs execute before completing.
+#               burst_time : int          - require number of cpu cycles a process
+#                                           needs execute before completing.
 #
-#               execution_time : int    - remaining number of cycles to be executed.
+#               remaining_cycles : int    - cpu cycles the process has left to execute. While it
+#                                           runs, the cycles of its current process interval are
+#                                           tracked by the scheduler as an expected finish time, and
+#                                           this holds what will be left once the interval is up,
+#                                           zero without one.
 #
-#               memory_footprint : int  - required amount of memory needed to execute process.
+#               memory_footprint : int    - required amount of memory needed to execute process in MB.
 #
-#               arrival_time : int      - time process begins excuting for the first time
-#                                         in cpu cycles.
+#               arrival_time : float      - clock at which the process begins excuting for the
+#                                           first time. -1 until it's attached.
 #
-#               completion_time : int   - time process stops excuting in cpu cycles.
+#               completion_time : float   - clock at which the process stops excuting. -1 until
+#                                           it completes.
 #
 # -----------------------------------\/\/\/-----------------------------------------
 
 
-@dataclass
 class Process:
-    PID: int
-    burst_time: int
-    execution_time: int
-    memory_footprint: int
-    arrival_time: int
-    completion_time: int
+
+    __slots__ = (
+        "PID",
+        "burst_time",
+        "remaining_cycles",
+        "memory_footprint",
+        "arrival_time",
+        "completion_time",
+    )
+
+    def __init__(
+        self,
+        PID,
+        burst_time,
+        remaining_cycles,
+        memory_footprint,
+        arrival_time,
+        completion_time,
+    ):
+        self.PID = PID
+        self.burst_time = burst_time
+        self.remaining_cycles = remaining_cycles
+        self.memory_footprint = memory_footprint
+        self.arrival_time = arrival_time
+        self.completion_time = completion_time
+
+    def __repr__(self):
+        return (
+            "Process(PID=%r, burst_time=%r, remaining_cycles=%r, memory_footprint=%r, "
+            "arrival_time=%r, completion_time=%r)"
+            % (
+                self.PID,
+                self.burst_time,
+                self.remaining_cycles,
+                self.memory_footprint,
+                self.arrival_time,
+                self.completion_time,
+            )
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (
+            self.PID,
+            self.burst_time,
+            self.remaining_cycles,
+            self.memory_footprint,
+            self.arrival_time,
+            self.completion_time,
+        ) == (
+            other.PID,
+            other.burst_time,
+            other.remaining_cycles,
+            other.memory_footprint,
+            other.arrival_time,
+            other.completion_time,
+        )
+
+    __hash__ = None
 
 
 # -----------------------------------/\/\/\--------------------------------------
 #
-#    Processor - dataclass stucture representing one of the system's processors
+#    Processor - stucture representing one of the system's processors. A list of
+#                processors makes up the machine description a Scheduler is built from.
+#                Uses __slots__ like Process.
+#
 #
+#    @fields:   clock_speed: float        - Clock speed of the processor in hertz
 #
-#    @fields:   clock_speed: int          - Clock speed of the processor in hertz
+#               memory : int              - amount of memory available to the processor in MB.
 #
 #               current_process : Process - Process currently occupying processor. It
 #                                          defaults to "None"(null) when processor is vacant.
@@ -46,11 +116,183 @@ class Process:
 # -----------------------------------\/\/\/--------------------------------------
 
 
-@dataclass
 class Processor:
-    clock_speed: int
-    memory: int
-    current_process: Process
+
+    __slots__ = ("clock_speed", "memory", "current_process")
+
+    def __init__(self, clock_speed, memory, current_process=None):
+        self.clock_speed = clock_speed
+        self.memory = memory
+        self.current_process = current_process
+
+    def __repr__(self):
+        return "Processor(clock_speed=%r, memory=%r, current_process=%r)" % (
+            self.clock_speed,
+            self.memory,
+            self.current_process,
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return (self.clock_speed, self.memory, self.current_process) == (
+            other.clock_speed,
+            other.memory,
+            other.current_process,
+        )
+
+    __hash__ = None
+
+
+##Three 2ghz processors with 8GB of memory and three 4ghz processors with 16GB of memory
+DEFAULT_MACHINE = [
+    Processor(2e9, 8192),
+    Processor(2e9, 8192),
+    Processor(2e9, 8192),
+    Processor(4e9, 16384),
+    Processor(4e9, 16384),
+    Processor(4e9, 16384),
+]
+
+
+##Placement policies of ProcessorPool.findFreeProcessor
+PLACEMENTS = ("first", "best", "worst")
+
+##Shortest process queue Scheduler.fastForward hands to the batch engine
+FAST_FORWARD_BATCH = 1024
+
+
+# -----------------------------------/\/\/\--------------------------------------
+#
+#    ProcessorPool - array backed storage for the system's processors. Processors are
+#                    referred to by their index in the machine description.
+#
+#                    Vacant processors are indexed by memory in a segment tree, so
+#                    placing or removing a process costs O(log n) whatever the placement:
+#
+#                    "first"  - first vacant processor with enough memory, in machine order.
+#                    "best"   - vacant processor with the least memory that's enough, so small
+#                               processes don't occupy the large processors needed by large ones.
+#                    "worst"  - vacant processor with the most memory.
+#
+#                    Ties go to the lowest index.
+#
+#
+#    @fields:   clock_speeds : array          - clock speed of each processor in hertz.
+#
+#               memory : array                - memory of each processor in MB.
+#
+#               current_processes : list      - process occupying each processor, "None" when vacant.
+#
+#               placement : str               - placement policy, one of PLACEMENTS.
+#
+#               positions : array             - leaf of each processor in the segment tree. Processors
+#                                               are in machine order, or ordered by memory for "best".
+#
+#               order : array                 - processor at each leaf of the segment tree.
+#
+#               free_memory : array           - segment tree over the leaves. Each node holds the
+#                                               largest memory of a vacant processor below it, or -1
+#                                               if they are all occupied.
+#
+# -----------------------------------\/\/\/--------------------------------------
+
+
+class ProcessorPool:
+
+    # ----------------------------------------------------------------------------
+    #    Default Constructor (__init__)
+    #
+    #    @params:   machine : list           - list of Processor describing the system
+    #
+    #               placement : str          - placement policy. defaults to "first".
+    #
+    # ----------------------------------------------------------------------------
+
+    def __init__(self, machine, placement="first"):
+        if placement not in PLACEMENTS:
+            raise ValueError("unknown placement %r" % (placement,))
+        self.placement = placement
+        self.clock_speeds = array("d", [processor.clock_speed for processor in machine])
+        self.memory = array("q", [processor.memory for processor in machine])
+        self.current_processes = [None] * len(machine)
+        if placement == "best":
+            self.order = array(
+                "q", sorted(range(len(machine)), key=lambda index: self.memory[index])
+            )
+        else:
+            self.order = array("q", range(len(machine)))
+        self.positions = array("q", [0]) * len(machine)
+        for leaf, index in enumerate(self.order):
+            self.positions[index] = leaf
+        self.leaves = 1
+        while self.leaves < len(machine):
+            self.leaves = self.leaves * 2
+        self.free_memory = array("q", [-1]) * (2 * self.leaves)
+        for index in range(len(machine)):
+            self.free_memory[self.leaves + self.positions[index]] = self.memory[index]
+        for node in range(self.leaves - 1, 0, -1):
+            self.free_memory[node] = max(
+                self.free_memory[2 * node], self.free_memory[2 * node + 1]
+            )
+
+    def __len__(self):
+        return len(self.current_processes)
+
+    # ----------------------------------------------------------------------------
+    #    setProcess - function that places a process on a processor, or vacates it
+    #
+    #
+    #    @params:       index : int             - index of the processor
+    #
+    #                   process : Process       - process to place on the processor. "None"
+    #                                             vacates it.
+    #
+    # ----------------------------------------------------------------------------
+
+    def setProcess(self, index, process):
+        self.current_processes[index] = process
+        free_memory = self.free_memory
+        node = self.leaves + self.positions[index]
+        free_memory[node] = -1 if process != None else self.memory[index]
+        while node > 1:
+            freeMemory = free_memory[node]
+            if free_memory[node ^ 1] > freeMemory:
+                freeMemory = free_memory[node ^ 1]
+            node = node // 2
+            if free_memory[node] == freeMemory:
+                break  ## ancestors are unchanged too
+            free_memory[node] = freeMemory
+
+    # ----------------------------------------------------------------------------
+    #    findFreeProcessor - function that finds a vacant processor with enough memory,
+    #                        chosen by the placement policy
+    #
+    #
+    #    @params:       memory_footprint : int  - memory required by the process
+    #
+    #    @returns:      index : int             - index of a vacant processor with at least
+    #                                             memory_footprint of memory. Returns -1 if there
+    #                                             isn't one.
+    #
+    # ----------------------------------------------------------------------------
+
+    def findFreeProcessor(self, memory_footprint):
+        free_memory = self.free_memory
+        if free_memory[1] < memory_footprint:
+            return -1
+        node = 1
+        if self.placement == "worst":
+            while node < self.leaves:
+                node = 2 * node
+                if free_memory[node] < free_memory[node + 1]:
+                    node = node + 1
+        else:
+            while node < self.leaves:  ## leftmost leaf with enough memory
+                node = 2 * node
+                if free_memory[node] < memory_footprint:
+                    node = node + 1
+        return self.order[node - self.leaves]
 
 
 # ---------------------/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\----------------------
@@ -62,12 +304,50 @@ class Processor:
 #                                             have been executed by all processors.
 #
 #               process_inverval : int      - maximum number of cpu cycles a process can run before
-#                                             surrendering it's processor. It defaults to zero, in
-#                                             which case, process runs to completion.
+#                                             surrendering it's processor and going to the back of
+#                                             the process queue. It defaults to zero, in which case,
+#                                             process runs to completion. Being in cycles, an interval
+#                                             lasts half as long on a processor twice as fast. While no
+#                                             process is waiting, a process keeps its processor when its
+#                                             interval is up, and its intervals up to completion are
+#                                             coalesced into one run with a single detach. See splitRuns.
+#                                             For time slicing in seconds, use PolicyScheduler with a
+#                                             RoundRobinPolicy.
+#
+#               process_queue : ReadyQueue  - queue of process waiting for a processor to become vacant.
+#
+#               machine : list              - list of Processor describing the system.
+#
+#               pool : ProcessorPool        - processors on the system, built from the machine description.
+#
+#               clock_speeds : list         - distinct clock speeds on the system, slowest first.
 #
-#               process_queue : list        - queue of process waiting for a processor to become vacant.
+#               completion_index : dict     - min-heap per clock speed of (finish, index, version)
+#                                             entries. Entries whose version no longer matches the
+#                                             processor are stale and are discarded lazily.
 #
-#               Pa, Pb, ... Pf : Processor  - represents processors on the system. Six in total.
+#               class_clocks : dict         - execution time elapsed per clock speed. Every running
+#                                             process in a class progresses by the same amount, so
+#                                             finish - class clock is its remaining execution time.
+#
+#               arrivals : iterator         - stream of (timestamp, Process) pairs that haven't
+#                                             arrived yet, in order of timestamp.
+#
+#               next_arrival : tuple        - next (timestamp, Process) pair of the stream. "None"
+#                                             once the stream is exhausted.
+#
+#               finish_times : array        - expected time the process on each processor finishes,
+#                                             or its process interval runs out, measured on its class
+#                                             clock. It's the class clock when the process was placed
+#                                             plus the cycles it was given divided by the clock speed.
+#
+#               run_starts : array          - class clock at which the run on each processor started.
+#
+#               run_cycles : list           - cycles of the coalesced run on each processor. Zero if
+#                                             it's vacant or its run is a single process interval.
+#
+#               instrumentation : Instrumentation - instrumentation installed by instrument, "None"
+#                                             while the scheduler isn't measured.
 #
 # ---------------------\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/\/----------------------
 
@@ -91,19 +371,51 @@ class Scheduler:
     #               processes : list         - list of processes to load into available
     #                                          processors and process queue
     #
+    #               machine : list           - list of Processor describing the system. defaults
+    #                                          to DEFAULT_MACHINE.
+    #
+    #               process_queue : ReadyQueue - queue waiting processes are held in. defaults to
+    #                                          a first come first served ReadyQueue.
+    #
+    #               arrivals : iterable      - stream of (timestamp, Process) pairs to feed in as the
+    #                                          clock reaches each timestamp. See streamProcesses.
+    #
+    #               placement : str          - how a vacant processor is chosen for a process. One of
+    #                                          PLACEMENTS, defaults to "first". See ProcessorPool.
+    #
     # ----------------------------------------------------------------------------
 
-    def __init__(self, process_interval=0, processes=[]):
+    def __init__(
+        self,
+        process_interval=0,
+        processes=None,
+        machine=DEFAULT_MACHINE,
+        process_queue=None,
+        arrivals=None,
+        placement="first",
+    ):
         self.clock = 0
-        self.process_queue = []
-        self.Pa = Processor(2e9, 8192, None)
-        self.Pb = Processor(2e9, 8192, None)
-        self.Pc = Processor(2e9, 8192, None)
-        self.Pd = Processor(4e9, 16384, None)
-        self.Pe = Processor(4e9, 16384, None)
-        self.Pf = Processor(4e9, 16384, None)
-        self.process_interval = process_interval
-        self.loadProcesses(processes)
+        self.process_queue = process_queue if process_queue != None else ReadyQueue()
+        self.machine = machine
+        self.pool = ProcessorPool(machine, placement)
+        self.versions = [0] * len(self.pool)
+        self.completion_index = {}
+        self.class_clocks = {}
+        for clock_speed in self.pool.clock_speeds:
+            self.completion_index.setdefault(clock_speed, [])
+            self.class_clocks.setdefault(clock_speed, 0)
+        self.clock_speeds = sorted(self.completion_index)
+        self.finish_times = array("d", [0]) * len(self.pool)
+        self.run_starts = array("d", [0]) * len(self.pool)
+        self.run_cycles = [0] * len(self.pool)
+        self.instrumentation = None
+        self.process_interval = int(process_interval)
+        self.arrivals = iter(())
+        self.next_arrival = None
+        if processes != None:
+            self.loadProcesses(processes)
+        if arrivals != None:
+            self.streamProcesses(arrivals)
 
     # ----------------------------------------------------------------------------
     #    loadProcesses - function that loads unexecuted processes into processors/process queue
@@ -116,216 +428,505 @@ class Scheduler:
 
     def loadProcesses(self, processes):
         for process in processes:
-            self.attachProcess(process)
+            self.submitProcess(process)
+
+    # ----------------------------------------------------------------------------
+    #    submitProcess - function that hands a new process to the scheduler. Same as attachProcess,
+    #                    but instrumentation sees it as a "submit" event at the current clock, which
+    #                    the process's wait is measured from. Loaded and streamed processes are
+    #                    submitted through it.
+    #
+    #
+    #    @params:       newProcess : Process    - process that hasn't been attached yet
+    #
+    # ----------------------------------------------------------------------------
+
+    def submitProcess(self, newProcess):
+        self.attachProcess(newProcess)
+
+    # ----------------------------------------------------------------------------
+    #    instrument - function that starts collecting counters, timers and processor utilization
+    #                 for this scheduler. Until it's called the scheduler isn't measured at all.
+    #
+    #
+    #    @params:       sink : function             - optional event sink, called as
+    #                                                 sink(event, clock, process, index)
+    #
+    #    @returns:      instrumentation : Instrumentation - collected measurements. Call its
+    #                                                       remove(scheduler) to stop measuring.
+    #
+    # ----------------------------------------------------------------------------
+
+    def instrument(self, sink=None):
+        from instrumentation import Instrumentation
+
+        instrumentation = Instrumentation(sink)
+        instrumentation.install(self)
+        return instrumentation
+
+    # ----------------------------------------------------------------------------
+    #    streamProcesses - function that feeds processes in lazily. Each process is only pulled
+    #                      from the stream and attached once the clock reaches its timestamp, so
+    #                      memory stays bounded by the processors and the process queue no matter
+    #                      how long the stream is.
+    #
+    #
+    #    @params:       arrivals : iterable     - (timestamp, Process) pairs in order of timestamp.
+    #                                             Can be a generator, e.g. generateArrivals.
+    #
+    # ----------------------------------------------------------------------------
+
+    def streamProcesses(self, arrivals):
+        self.arrivals = iter(arrivals)
+        self.next_arrival = next(self.arrivals, None)
+
+    # ----------------------------------------------------------------------------
+    #    admitArrivals - helper function that attaches every streamed process that arrives before
+    #                    the next process is detached. Running processes progress up to each arrival.
+    #                    If all processors are vacant, the clock skips ahead to the next arrival.
+    #
+    # ----------------------------------------------------------------------------
+
+    def admitArrivals(self):
+        while self.next_arrival != None:
+            timestamp, process = self.next_arrival
+            index = self.getNextProcessorToComplete()
+            if (
+                index != None
+                and self.clock
+                + self.getRemainingTime(index) / self.pool.clock_speeds[index]
+                <= timestamp
+            ):
+                break
+            if timestamp > self.clock:
+                self.advanceClock(timestamp - self.clock)
+            self.submitProcess(process)
+            self.next_arrival = next(self.arrivals, None)
+
+    # ----------------------------------------------------------------------------
+    #    run - function that simulates a whole workload in one call with the columnar batch
+    #          engine. Same as loading the processes and calling detachProcess until it
+    #          returns "None", without creating a Process object per job. Needs NumPy.
+    #
+    #
+    #    @params:       workload : Workload     - processes to simulate. A list of Process is
+    #                                             converted first. Not modified.
+    #
+    #                   cache : ResultCache     - cache to look the result up in, and save it to,
+    #                                             instead of always simulating. defaults to none.
+    #
+    #    @returns:      result : Workload       - workload with arrival times, completion times and
+    #                                             remaining cycles filled in. See batch_engine.simulate.
+    #
+    # ----------------------------------------------------------------------------
+
+    def run(self, workload, cache=None):
+        from batch_engine import Workload, simulate
+
+        if (
+            self.process_queue
+            or self.next_arrival != None
+            or any(process != None for process in self.pool.current_processes)
+        ):
+            raise ValueError("run() needs a Scheduler with no loaded processes")
+        if type(self.process_queue) != ReadyQueue:
+            raise ValueError(
+                "run() only supports a first come first served process_queue"
+            )
+        if not isinstance(workload, Workload):
+            workload = Workload.fromProcesses(workload)
+        if cache != None:
+            simulate = cache.simulate
+        result, self.clock = simulate(
+            workload,
+            self.machine,
+            self.process_interval,
+            self.clock,
+            self.pool.placement,
+        )
+        return result
+
+    # ----------------------------------------------------------------------------
+    #    fastForward - function that completes every running and queued process in one call.
+    #                  Same as calling detachProcess until it returns "None". A queue of at
+    #                  least FAST_FORWARD_BATCH processes is drained by the batch engine, which
+    #                  follows the same rules without Process objects and needs NumPy. On a
+    #                  machine with one clock speed it completes the queue with a single heap
+    #                  loop, see batch_engine.simulateSingleClass. Shorter queues are cheaper to
+    #                  drain with detachProcess, and so is every queue of an instrumented
+    #                  scheduler, so its counters and event sink see each detach. Needs no
+    #                  process interval and no streamed arrivals.
+    #
+    #
+    #    @returns:      completed : list        - processes that completed, in order of completion
+    #
+    # ----------------------------------------------------------------------------
+
+    def fastForward(self):
+        if self.process_interval != 0 or self.next_arrival != None:
+            raise ValueError(
+                "fastForward() needs a Scheduler without a process interval or arrivals"
+            )
+        if type(self.process_queue) != ReadyQueue:
+            raise ValueError(
+                "fastForward() only supports a first come first served process_queue"
+            )
+        if len(self.process_queue) < FAST_FORWARD_BATCH or self.instrumentation != None:
+            completed = []
+            endingProcess = self.detachProcess()
+            while endingProcess != None:
+                completed.append(endingProcess)
+                endingProcess = self.detachProcess()
+            return completed
+
+        from batch_engine import Workload, simulate
+
+        running = [
+            (index, process)
+            for index, process in enumerate(self.pool.current_processes)
+            if process != None
+        ]
+        processes = [process for index, process in running]
+        processes.extend(self.process_queue)
+        result, clock = simulate(
+            Workload.fromProcesses(processes),
+            self.machine,
+            0,
+            self.clock,
+            self.pool.placement,
+            (
+                self.class_clocks,
+                [
+                    (index, row, self.finish_times[index])
+                    for row, (index, process) in enumerate(running)
+                ],
+            ),
+        )
+        for process, arrival, completion in zip(
+            processes, result.arrival_time.tolist(), result.completion_time.tolist()
+        ):
+            process.remaining_cycles = 0
+            process.arrival_time = arrival
+            process.completion_time = completion
+        self.clock = clock  ## class_clocks were brought to the same point by simulate
+        for class_clock_speed in self.clock_speeds:
+            self.expireCompletionIndex(class_clock_speed)
+        for index, process in running:
+            self.setProcess(index, None)
+        self.process_queue = ReadyQueue()
+        return sorted(processes, key=lambda process: process.completion_time)
 
     # ----------------------------------------------------------------------------
     #    getNextProcessorToDetach - function that finds the next processor to be detached
     #
     #
-    #    @returns:     processorToDetach : Processor    - the processor that occupied by the process
+    #    @params:      clock_speed : int                - if given, only processors slower than
+    #                                                     clock_speed are considered. Used when a
+    #                                                     process is reattached to a faster processor.
+    #
+    #    @returns:     processorToDetach : int          - index of the processor that occupied by the process
     #                                                     with the shortest remaining execution
     #                                                     time. Returns "None" if all processors
     #                                                     are vacant.
     #
     # ----------------------------------------------------------------------------
 
-    def getNextProcessorToComplete(self, isReattaching):
+    def getNextProcessorToComplete(self, clock_speed=None):
         processorToDetach = None
         shortestRuntime = (
             10e12 + 1 / 2e9
         )  ##Defaults to value larger than maximum possible burst time(10*10^12) divided by the clock speed of the slowest processor
 
-        if self.Pa.current_process != None:
-            if self.Pa.current_process.execution_time < shortestRuntime:
-                shortestRuntime = self.Pa.current_process.execution_time
-                processorToDetach = self.Pa
+        for class_clock_speed in self.clock_speeds:
+            if clock_speed != None and class_clock_speed >= clock_speed:
+                break
+            index = self.peekCompletionIndex(class_clock_speed)
+            if index != None:
+                runtime = self.getRemainingTime(index)
+                if runtime < shortestRuntime or (
+                    runtime == shortestRuntime and index < processorToDetach
+                ):
+                    shortestRuntime = runtime
+                    processorToDetach = index
+
+        return processorToDetach
 
-        if self.Pb.current_process != None:
-            if self.Pb.current_process.execution_time < shortestRuntime:
-                shortestRuntime = self.Pb.current_process.execution_time
-                processorToDetach = self.Pb
+    # ----------------------------------------------------------------------------
+    #    peekCompletionIndex - helper function that returns the processor of a clock speed class
+    #                          whose process finishes first. Stale heap entries are popped on the way.
+    #                          Ties are broken by processor index, same as scanning every processor.
+    #
+    #
+    #    @params:       clock_speed : int           - clock speed class to look up
+    #
+    #    @returns:      index : int                 - index of the busy processor that finishes first.
+    #                                                 Returns "None" if every processor in the class
+    #                                                 is vacant.
+    #
+    # ----------------------------------------------------------------------------
 
-        if self.Pc.current_process != None:
-            if self.Pc.current_process.execution_time < shortestRuntime:
+    def peekCompletionIndex(self, clock_speed):
+        heap = self.completion_index[clock_speed]
+        while heap:
+            finish, index, version = heap[0]
+            if self.versions[index] == version:
+                return index
+            heapq.heappop(heap)
+        return None
 
-                shortestRuntime = self.Pc.current_process.execution_time
-                processorToDetach = self.Pc
+    # ----------------------------------------------------------------------------
+    #    getRemainingTime - helper function that returns the remaining execution time of the
+    #                       process on a processor from its expected finish time
+    #
+    #
+    #    @params:       index : int                 - index of an occupied processor
+    #
+    #    @returns:      remainingTime : float       - remaining execution time of the process
+    #
+    # ----------------------------------------------------------------------------
 
-        if (
-            isReattaching == False
-        ):  ## Only check 4ghz processors when your not try to reattach to another 4ghz
-            if self.Pd.current_process != None:
-                if self.Pd.current_process.execution_time < shortestRuntime:
+    def getRemainingTime(self, index):
+        return (
+            self.finish_times[index] - self.class_clocks[self.pool.clock_speeds[index]]
+        )
 
-                    shortestRuntime = self.Pd.current_process.execution_time
-                    processorToDetach = self.Pd
+    # ----------------------------------------------------------------------------
+    #    getNextCompletionTime - function that returns the clock at which detachProcess would
+    #                            detach the next process, ignoring streamed arrivals
+    #
+    #
+    #    @returns:      clock : float               - "None" if all processors are vacant
+    #
+    # ----------------------------------------------------------------------------
 
-            if self.Pe.current_process != None:
-                if self.Pe.current_process.execution_time < shortestRuntime:
-                    shortestRuntime = self.Pe.current_process.execution_time
-                    processorToDetach = self.Pe
+    def getNextCompletionTime(self):
+        index = self.getNextProcessorToComplete()
+        if index == None:
+            return None
+        return self.clock + self.getRemainingTime(index) / self.pool.clock_speeds[index]
 
-            if self.Pf.current_process != None:
-                if self.Pf.current_process.execution_time < shortestRuntime:
-                    shortestRuntime = self.Pf.current_process.execution_time
-                    processorToDetach = self.Pf
+    # ----------------------------------------------------------------------------
+    #    setProcess - helper function that places a process on a processor, or vacates it,
+    #                 and keeps the completion index up to date. The old heap entry of the
+    #                 processor is invalidated and a new one is pushed if it's occupied.
+    #
+    #
+    #    @params:       index : int                 - index of the processor
+    #
+    #                   process : Process           - process to place on the processor. "None"
+    #                                                 vacates it.
+    #
+    # ----------------------------------------------------------------------------
 
-        return processorToDetach
+    def setProcess(self, index, process):
+        self.pool.setProcess(index, process)
+        self.indexProcessor(index)
 
     # ----------------------------------------------------------------------------
-    #    updateClock - function that updates the clock and exeuction time of all active processes
-    #                  before a process detachs from a processor. if there isn't a process_interval,
-    #                  the clock is increamented by the ending processes remaining exeuction time.
-    #                  Otherwise, it's incremented by the process interval.
+    #    indexProcessor - helper function that records the expected finish time of the process on
+    #                     a processor from its remaining_cycles. Must be called whenever a processor's
+    #                     remaining execution time changes other than through its class clock.
+    #                     With a process interval, the process only runs until the interval is up,
+    #                     and the rest of its cycles stay in remaining_cycles. If no process is
+    #                     waiting, it's given all of its cycles as one coalesced run instead.
     #
     #
-    #    @params:      process : Process         - process that's going to be detached
-    #                  clock_speed:int           - clock speed of the detaching process
+    #    @params:       index : int                 - index of the processor
     #
     # ----------------------------------------------------------------------------
-    def updateClock(self, process, clock_speed):
-        if self.process_interval == 0:
-            self.clock = self.clock + (process.execution_time / clock_speed)
-            if self.Pa.current_process != None:
-                self.updateProcessExecutionTimes(self.Pa, process, clock_speed)
-            if self.Pb.current_process != None:
-                self.updateProcessExecutionTimes(self.Pb, process, clock_speed)
-            if self.Pc.current_process != None:
-                self.updateProcessExecutionTimes(self.Pc, process, clock_speed)
-            if self.Pd.current_process != None:
-                self.updateProcessExecutionTimes(self.Pd, process, clock_speed)
-            if self.Pe.current_process != None:
-                self.updateProcessExecutionTimes(self.Pe, process, clock_speed)
-            if self.Pf.current_process != None:
-                self.updateProcessExecutionTimes(self.Pf, process, clock_speed)
-        else:
-            self.clock = self.clock + self.process_interval
+
+    def indexProcessor(self, index):
+        self.versions[index] = self.versions[index] + 1
+        self.run_cycles[index] = 0
+        process = self.pool.current_processes[index]
+        if process != None:
+            clock_speed = self.pool.clock_speeds[index]
+            cycles = process.remaining_cycles
+            if self.process_interval != 0 and cycles > self.process_interval:
+                if self.process_queue:
+                    cycles = self.process_interval
+                else:
+                    self.run_cycles[index] = cycles
+            process.remaining_cycles = process.remaining_cycles - cycles
+            self.run_starts[index] = self.class_clocks[clock_speed]
+            self.finish_times[index] = self.run_starts[index] + cycles / clock_speed
+            heapq.heappush(
+                self.completion_index[clock_speed],
+                (self.finish_times[index], index, self.versions[index]),
+            )
+
+    # ----------------------------------------------------------------------------
+    #    splitRuns - helper function that ends every coalesced run at the end of the process
+    #                interval it's in, as if each interval had been a run of its own. Must be
+    #                called before a process starts waiting in an empty process queue.
+    # ----------------------------------------------------------------------------
+
+    def splitRuns(self):
+        for index in range(len(self.pool)):
+            cycles = self.run_cycles[index]
+            if cycles == 0:
+                continue
+            self.run_cycles[index] = 0
+            clock_speed = self.pool.clock_speeds[index]
+            ran = (
+                self.class_clocks[clock_speed] - self.run_starts[index]
+            ) * clock_speed
+            runCycles = (int(ran // self.process_interval) + 1) * self.process_interval
+            if runCycles < cycles:
+                process = self.pool.current_processes[index]
+                process.remaining_cycles = process.remaining_cycles + cycles - runCycles
+                self.versions[index] = self.versions[index] + 1
+                self.finish_times[index] = (
+                    self.run_starts[index] + runCycles / clock_speed
+                )
+                heapq.heappush(
+                    self.completion_index[clock_speed],
+                    (self.finish_times[index], index, self.versions[index]),
+                )
 
     # ----------------------------------------------------------------------------
-    #    updateProcessExecutionTimes - Helper function to update execution times of all other active processes.
-    #                                  Processes running concerrently with the ending process need to
-    #                                  have their excution times reduced by the amount of time
-    #                                  the ending process had run for.
+    #    expireCompletionIndex - helper function that re-keys processes whose expected finish time
+    #                            has been passed by their class clock. They have no execution time
+    #                            left, so they all tie at the class clock and the first processor
+    #                            completes first. Each process is re-keyed at most once before it
+    #                            completes, since a zero remaining time is always detached next.
     #
-    #                                  e.g. Process A had run for 100 cycles, so Processes B to F need to
-    #                                       have their remaining execution time reduced by 100 because they were
-    #                                       running at the same time as Process A
     #
+    #    @params:       clock_speed : int           - clock speed class that has advanced
     #
-    #    @params:                     processor : Processor     - processor of process that will be detacted
+    # ----------------------------------------------------------------------------
+
+    def expireCompletionIndex(self, clock_speed):
+        heap = self.completion_index[clock_speed]
+        class_clock = self.class_clocks[clock_speed]
+        while heap and heap[0][0] < class_clock:
+            finish, index, version = heapq.heappop(heap)
+            if self.versions[index] == version:
+                self.versions[index] = self.versions[index] + 1
+                self.finish_times[index] = class_clock
+                heapq.heappush(heap, (class_clock, index, self.versions[index]))
+
+    # ----------------------------------------------------------------------------
+    #    advanceClock - helper function that moves the clock forward while processes keep
+    #                   running. The clock of each clock speed class advances by the same
+    #                   time scaled by its clock speed.
     #
-    #                                 process : Process         - process that's going to be detached
     #
-    #                                 closing_clock_speed:int   - clock speed of closing process
+    #    @params:      time : float              - time to move the clock forward by
     #
     # ----------------------------------------------------------------------------
 
-    def updateProcessExecutionTimes(
-        self, processor, closing_process, closing_clock_speed
-    ):
-        if processor.clock_speed == closing_clock_speed:
-            if (
-                processor.current_process.execution_time
-                > closing_process.execution_time
-            ):
-                processor.current_process.execution_time = (
-                    processor.current_process.execution_time
-                    - closing_process.execution_time
-                )
-            else:
-                processor.current_process.execution_time = 0
-        elif closing_clock_speed > processor.clock_speed:
-            if processor.current_process.execution_time > (
-                closing_process.execution_time / 2
-            ):
-                processor.current_process.execution_time = (
-                    processor.current_process.execution_time
-                    - (closing_process.execution_time / 2)
-                )
-            else:
-                processor.current_process.execution_time = 0
-        else:
-            if processor.current_process.execution_time > (
-                closing_process.execution_time * 2
-            ):
-                processor.current_process.execution_time = (
-                    processor.current_process.execution_time
-                    - (closing_process.execution_time * 2)
-                )
-            else:
-                processor.current_process.execution_time = 0
+    def advanceClock(self, time):
+        self.clock = self.clock + time
+        for class_clock_speed in self.clock_speeds:
+            self.class_clocks[class_clock_speed] = (
+                self.class_clocks[class_clock_speed] + time * class_clock_speed
+            )
+            self.expireCompletionIndex(class_clock_speed)
+
+    # ----------------------------------------------------------------------------
+    #    updateClock - function that updates the clock before a process detachs from a processor.
+    #                  The clock is increamented by the ending processes remaining exeuction time,
+    #                  which is up to the end of its process interval if there is one.
+    #
+    #                  Processes running concerrently with the ending process aren't touched.
+    #                  Instead, the clock of every clock speed class is advanced by the time the
+    #                  ending process had run for, scaled by the ratio of the two clock speeds.
+    #
+    #                  e.g. Process A had run for 100 cycles, so the class clocks of Processes B to F
+    #                       advance by 100 and their remaining execution time is 100 shorter
+    #
+    #
+    #    @params:      runtime : float           - remaining execution time of the detaching process
+    #                                            on its class clock
+    #                  clock_speed:int           - clock speed of the detaching process
+    #
+    # ----------------------------------------------------------------------------
+    def updateClock(self, runtime, clock_speed):
+        self.clock = self.clock + (runtime / clock_speed)
+        for class_clock_speed in self.clock_speeds:
+            self.class_clocks[class_clock_speed] = self.class_clocks[
+                class_clock_speed
+            ] + runtime * (class_clock_speed / clock_speed)
+            self.expireCompletionIndex(class_clock_speed)
 
     # ----------------------------------------------------------------------------
     #    detachProcess - function that will detact a process from one of the processors on the system.
     #                    Once detacted, the next process in the process queue is attached to the next availible processor.
-    #                    If there is a process interval greater than zero and the burst time is greater than the interval,
-    #                    than the ending process is pushed back to the end of the process queue.
+    #                    If there is a process interval greater than zero and the process has cycles left
+    #                    once it's up, than the ending process is pushed back to the end of the process queue first.
+    #                    If no process is waiting, it keeps its processor instead and isn't detached.
+    #                    Streamed processes that arrive before the ending process is detached are attached first.
     #
     #
-    #    @returns:      endingProcess : Process         - process that's going to be detached. Returns "None"
-    #                                                     if all processors are vacant
+    #    @returns:      endingProcess : Process         - process that's going to be detached. Its completion_time
+    #                                                     stays -1 if it was pushed back to the queue. Returns "None"
+    #                                                     if all processors are vacant and the stream is exhausted
     #
     # ----------------------------------------------------------------------------
 
     def detachProcess(self):
-        processor = self.getNextProcessorToComplete(False)
-        if processor == None:
-            return None
-        self.updateClock(processor.current_process, processor.clock_speed)
+        while True:
+            self.admitArrivals()
+            index = self.getNextProcessorToComplete()
+            if index == None:
+                return None
+            clock_speed = self.pool.clock_speeds[index]
+            endingProcess = self.pool.current_processes[index]
+            self.updateClock(self.getRemainingTime(index), clock_speed)
+            if endingProcess.remaining_cycles == 0 or self.process_queue:
+                break
+            ## its process interval is up, but nothing is waiting for the processor
+            self.indexProcessor(index)
+
+        ## nothing left after this process interval
+        if endingProcess.remaining_cycles == 0:
+            ## before vacating, so it's complete when detached
+            endingProcess.completion_time = self.clock
+
+        self.setProcess(
+            index, None
+        )  ## Once detach find the shortest remaining execution time from one on a slower processor or queue
+        if endingProcess.remaining_cycles > 0:
+            self.process_queue.push(endingProcess)
 
-        endingProcess = processor.current_process
-
-        endingProcess.completion_time = self.clock
-
-        processor.current_process = None  ## Once detach find the shortest remaining execution time from one on the processor or queue if 4ghz
         if self.process_queue:
-            if processor.clock_speed == 4e9:
-                nextProcessorToComplete = self.getNextProcessorToComplete(True)
+            if clock_speed > self.clock_speeds[0]:
+                nextProcessorToComplete = self.getNextProcessorToComplete(clock_speed)
                 if nextProcessorToComplete != None:
                     if (
-                        self.process_queue[0].execution_time / 2e9
-                        <= nextProcessorToComplete.current_process.execution_time
+                        self.process_queue.peek().remaining_cycles
+                        / self.pool.clock_speeds[nextProcessorToComplete]
+                        <= self.getRemainingTime(nextProcessorToComplete)
                     ):
-                        self.attachProcessFromQueue(processor)
+                        self.attachProcessFromQueue(index)
 
                     else:
-                        self.attachProcessFromProcessor(
-                            processor, nextProcessorToComplete
-                        )
+                        self.attachProcessFromProcessor(index, nextProcessorToComplete)
                 else:
-                    self.attachProcess(self.process_queue.pop(0))
+                    self.attachProcess(self.process_queue.pop())
 
             else:
-                self.attachProcess(self.process_queue.pop(0))
+                self.attachProcess(self.process_queue.pop())
 
-        if self.process_interval == 0 or endingProcess.burst_time == 0:
-            return endingProcess
-        else:
-            if self.process_interval <= endingProcess.burst_time:
-                endingProcess.burst_time = (
-                    endingProcess.burst_time - self.process_interval
-                )
-            else:
-                endingProcess.burst_time = 0
-            self.process_queue.append(endingProcess)
-            return endingProcess
+        return endingProcess
 
     # ----------------------------------------------------------------------------
     #    attachProcessFromQueue - helper function that will attach a process from the
     #                             front of the process queue to a particular processor
     #
     #
-    #    @params:       processor : Processor   - processor the new process will attach to
+    #    @params:       index : int             - index of the processor the new process will attach to
     #
     # ----------------------------------------------------------------------------
 
-    def attachProcessFromQueue(self, processor):
+    def attachProcessFromQueue(self, index):
 
-        newProcess = self.process_queue.pop(0)
-        if processor.memory <= newProcess.memory_footprint:
-            newProcess.execution_time = newProcess.execution_time / 4e9
-            newProcess.arrival_time = self.clock
-            processor.current_process = newProcess
+        newProcess = self.process_queue.pop()
+        if self.pool.memory[index] >= newProcess.memory_footprint:
+            if newProcess.arrival_time == -1:
+                newProcess.arrival_time = self.clock
+            self.setProcess(index, newProcess)
         else:
             self.attachProcess(newProcess)
 
@@ -334,22 +935,27 @@ class Scheduler:
     #                                 processor to another.
     #
     #
-    #    @params:       processor : Processor             - processor the process will attach to
+    #    @params:       index : int                     - index of the processor the process will attach to
     #
-    #                   nextProcessorToComplete:Processor - processor the process will dettach from
+    #                   nextProcessorToComplete : int   - index of the processor the process will dettach from
     #
     # ----------------------------------------------------------------------------
-    def attachProcessFromProcessor(self, processor, nextProcessorToComplete):
-        newProcess = nextProcessorToComplete.current_process
-        if processor.memory <= newProcess.memory_footprint:
-            newProcess.execution_time = (newProcess.execution_time * 2e9) / 4e9
-            nextProcessorToComplete.current_process = None
-            processor.current_process = newProcess
-        self.attachProcess(self.process_queue.pop(0))
+    def attachProcessFromProcessor(self, index, nextProcessorToComplete):
+        newProcess = self.pool.current_processes[nextProcessorToComplete]
+        if self.pool.memory[index] >= newProcess.memory_footprint:
+            ## cycles left of its interval on the slower processor, back in whole cycles
+            newProcess.remaining_cycles = newProcess.remaining_cycles + round(
+                self.getRemainingTime(nextProcessorToComplete)
+                * self.pool.clock_speeds[nextProcessorToComplete]
+            )
+            self.setProcess(nextProcessorToComplete, None)
+            self.setProcess(index, newProcess)
+        self.attachProcess(self.process_queue.pop())
 
     # ----------------------------------------------------------------------------
-    #    attachProcess - function that will attact a process to the next availible processor. If all
-    #                    processors are occupied, the process is pushed to the back of the process queue
+    #    attachProcess - function that will attact a process to the first availible processor with
+    #                    enough memory. If all processors are occupied, the process is pushed to
+    #                    the back of the process queue.
     #
     #
     #    @returns:      newProcess : Process         - process attempting to execute.
@@ -357,62 +963,12 @@ class Scheduler:
     # ----------------------------------------------------------------------------
 
     def attachProcess(self, newProcess):
-
-        if (
-            self.Pa.current_process == None
-            and newProcess.memory_footprint <= self.Pa.memory
-        ):
-            if newProcess.arrival_time == -1:
-                newProcess.arrival_time = self.clock
-                newProcess.execution_time = (
-                    newProcess.execution_time / 2e9
-                )  ##convert remaining excution time to seconds depending on processor
-            self.Pa.current_process = newProcess
-
-        elif (
-            self.Pb.current_process == None
-            and newProcess.memory_footprint <= self.Pb.memory
-        ):
-            if newProcess.arrival_time == -1:
-                newProcess.arrival_time = self.clock
-                newProcess.execution_time = newProcess.execution_time / 2e9
-            self.Pb.current_process = newProcess
-
-        elif (
-            self.Pc.current_process == None
-            and newProcess.memory_footprint <= self.Pc.memory
-        ):
-
-            if newProcess.arrival_time == -1:
-                newProcess.arrival_time = self.clock
-                newProcess.execution_time = newProcess.execution_time / 2e9
-            self.Pc.current_process = newProcess
-
-        elif (
-            self.Pd.current_process == None
-            and newProcess.memory_footprint <= self.Pd.memory
-        ):
-            if newProcess.arrival_time == -1:
-                newProcess.arrival_time = self.clock
-                newProcess.execution_time = newProcess.execution_time / 4e9
-            self.Pd.current_process = newProcess
-
-        elif (
-            self.Pe.current_process == None
-            and newProcess.memory_footprint <= self.Pe.memory
-        ):
-            if newProcess.arrival_time == -1:
-                newProcess.arrival_time = self.clock
-                newProcess.execution_time = newProcess.execution_time / 4e9
-            self.Pe.current_process = newProcess
-
-        elif (
-            self.Pf.current_process == None
-            and newProcess.memory_footprint <= self.Pf.memory
-        ):
-            if newProcess.arrival_time == -1:
-                newProcess.arrival_time = self.clock
-                newProcess.execution_time = newProcess.execution_time / 4e9
-            self.Pf.current_process = newProcess
-        else:
-            self.process_queue.append(newProcess)
+        index = self.pool.findFreeProcessor(newProcess.memory_footprint)
+        if index == -1:
+            if self.process_interval != 0 and not self.process_queue:
+                self.splitRuns()
+            self.process_queue.push(newProcess)
+            return
+        if newProcess.arrival_time == -1:
+            newProcess.arrival_time = self.clock
+        self.setProcess(index, newProcess)
@@ -0,0 +1,215 @@
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+import itertools
+import time
+
+from process_generator import generateProcesses
+from scheduler import DEFAULT_MACHINE, Scheduler
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    SweepConfig - dataclass stucture describing one simulation of a parameter sweep
+#
+#
+#    @fields:   machine_name : str          - name of the machine description, used to
+#                                             group results.
+#
+#               machine : list              - list of Processor describing the system.
+#
+#               process_interval : int      - process interval of the Scheduler.
+#
+#               processes : int             - number of processes in the workload.
+#
+#               seed : int                  - seed the workload is generated from. Configs
+#                                             with the same seed simulate the same workload.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+@dataclass
+class SweepConfig:
+    machine_name: str = "default"
+    machine: list = field(default_factory=lambda: DEFAULT_MACHINE)
+    process_interval: int = 0
+    processes: int = 250
+    seed: int = 0
+
+
+# -----------------------------------/\/\/\---------------------------------------
+#
+#    SweepResult - dataclass stucture holding the outcome of one or more simulations
+#                  of the same machine and process interval
+#
+#
+#    @fields:   config : SweepConfig        - configuration that was simulated. For merged
+#                                             results, the first one.
+#
+#               runs : int                  - number of simulations merged into the result.
+#
+#               completed : int             - number of processes that completed.
+#
+#               turnaround_sum : float      - sum of turnaround times.
+#
+#               turnaround_max : float      - longest turnaround time.
+#
+#               wait_sum : float            - sum of wait times.
+#
+#               wait_max : float            - longest wait time.
+#
+#               wall_time : float           - seconds spent simulating, summed over runs.
+#
+# -----------------------------------\/\/\/-----------------------------------------
+
+
+@dataclass
+class SweepResult:
+    config: SweepConfig
+    runs: int = 0
+    completed: int = 0
+    turnaround_sum: float = 0
+    turnaround_max: float = float("-inf")
+    wait_sum: float = 0
+    wait_max: float = float("-inf")
+    wall_time: float = 0
+
+    def averageTurnaround(self):
+        return self.turnaround_sum / self.completed if self.completed else 0
+
+    def averageWait(self):
+        return self.wait_sum / self.completed if self.completed else 0
+
+    # ----------------------------------------------------------------------------
+    #    merge - function that adds the totals of another result to this one
+    #
+    #
+    #    @params:       other : SweepResult     - result to merge in
+    #
+    # ----------------------------------------------------------------------------
+
+    def merge(self, other):
+        self.runs = self.runs + other.runs
+        self.completed = self.completed + other.completed
+        self.turnaround_sum = self.turnaround_sum + other.turnaround_sum
+        self.turnaround_max = max(self.turnaround_max, other.turnaround_max)
+        self.wait_sum = self.wait_sum + other.wait_sum
+        self.wait_max = max(self.wait_max, other.wait_max)
+        self.wall_time = self.wall_time + other.wall_time
+
+
+# ----------------------------------------------------------------------------
+#    makeSweep - builds the configurations of a sweep, one per combination of machine,
+#                process interval and seed
+#
+#
+#    @params:  machines : dict           - machine descriptions by name
+#
+#              process_intervals : list  - process intervals to simulate
+#
+#              seeds : list              - workload seeds to simulate
+#
+#              processes : int           - number of processes per workload
+#
+#    @returns - configurations : list
+# ----------------------------------------------------------------------------
+
+
+def makeSweep(machines, process_intervals, seeds, processes=250):
+    return [
+        SweepConfig(name, machines[name], process_interval, processes, seed)
+        for name, process_interval, seed in itertools.product(
+            machines, process_intervals, seeds
+        )
+    ]
+
+
+# ----------------------------------------------------------------------------
+#    runSimulation - simulates one configuration. Runs in a worker process, so it only
+#                    sends the totals back rather than the whole workload. Wait time is
+#                    the time a process spent queued before it first started executing.
+#                    With a cache, a configuration simulated before is read back, and
+#                    wall_time is the time the lookup took.
+#
+#
+#    @params:  config : SweepConfig      - configuration to simulate
+#
+#              cache_dir : str           - directory of a ResultCache shared by the workers.
+#                                          defaults to no cache.
+#
+#    @returns - result : SweepResult
+# ----------------------------------------------------------------------------
+
+
+def runSimulation(config, cache_dir=None):
+    cache = None
+    if cache_dir != None:
+        from cache import openCache
+
+        cache = openCache(cache_dir)
+    workload = generateProcesses(config.processes, seed=config.seed)
+    scheduler = Scheduler(config.process_interval, machine=config.machine)
+    submitted = scheduler.clock  ## the whole workload is handed over at once
+    start = time.perf_counter()
+    result = scheduler.run(workload, cache)
+    wallTime = time.perf_counter() - start
+
+    completed = result.completion_time != -1
+    turnaroundTimes = (result.completion_time - result.arrival_time)[completed]
+    waitTimes = result.arrival_time[completed] - submitted
+    return SweepResult(
+        config,
+        1,
+        len(turnaroundTimes),
+        float(turnaroundTimes.sum()),
+        float(turnaroundTimes.max(initial=float("-inf"))),
+        float(waitTimes.sum()),
+        float(waitTimes.max(initial=float("-inf"))),
+        wallTime,
+    )
+
+
+# ----------------------------------------------------------------------------
+#    runSweep - simulates every configuration over a pool of worker processes. Results
+#               are yielded as soon as each simulation finishes, so they can be
+#               aggregated or written out while the sweep is still running.
+#
+#
+#    @params:  configs : list            - configurations to simulate
+#
+#              max_workers : int         - number of worker processes. defaults to the
+#                                          number of cpus.
+#
+#              cache_dir : str           - directory of a ResultCache shared by the workers.
+#                                          defaults to no cache.
+#
+#    @returns - results in order of completion : generator of SweepResult
+# ----------------------------------------------------------------------------
+
+
+def runSweep(configs, max_workers=None, cache_dir=None):
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [
+            executor.submit(runSimulation, config, cache_dir) for config in configs
+        ]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+# ----------------------------------------------------------------------------
+#    aggregateSweep - merges results of the same machine and process interval across seeds
+#
+#
+#    @params:  results : iterable        - results, e.g. from runSweep
+#
+#    @returns - merged results by (machine_name, process_interval) : dict
+# ----------------------------------------------------------------------------
+
+
+def aggregateSweep(results):
+    totals = {}
+    for result in results:
+        key = (result.config.machine_name, result.config.process_interval)
+        if key not in totals:
+            totals[key] = SweepResult(result.config)
+        totals[key].merge(result)
+    return totals
@@ -0,0 +1,58 @@
+import pytest
+
+from process_generator import generateProcesses
+from scheduler import DEFAULT_MACHINE, Processor, Scheduler
+
+
+# ----------------------------------------------------------------------------
+#    assertRunMatchesDetach - checks Scheduler.run gives the same arrival and completion
+#                             times and final clock as calling detachProcess until it
+#                             returns "None"
+# ----------------------------------------------------------------------------
+
+
+def assertRunMatchesDetach(
+    workload, process_interval=0, placement="first", machine=DEFAULT_MACHINE
+):
+    processes = workload.toProcesses()
+    scheduler = Scheduler(process_interval, machine=machine, placement=placement)
+    scheduler.loadProcesses(processes)
+    while scheduler.detachProcess() != None:
+        pass
+
+    batch = Scheduler(process_interval, machine=machine, placement=placement)
+    result = batch.run(workload)
+    assert batch.clock == scheduler.clock
+    assert result.arrival_time.tolist() == [
+        process.arrival_time for process in processes
+    ]
+    assert result.completion_time.tolist() == [
+        process.completion_time for process in processes
+    ]
+    assert result.burst_time.tolist() == workload.burst_time.tolist()
+
+
+@pytest.mark.parametrize("seed", range(10))
+@pytest.mark.parametrize("process_interval", [10**11, 3 * 10**11])
+def testRunMatchesDetachWithProcessInterval(seed, process_interval):
+    assertRunMatchesDetach(generateProcesses(60, seed=seed), process_interval)
+
+
+@pytest.mark.parametrize("seed", [17, 52] + list(range(8)))
+@pytest.mark.parametrize("placement", ["first", "best"])
+def testRunMatchesDetach(seed, placement):
+    assertRunMatchesDetach(generateProcesses(400, seed=seed), placement=placement)
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize(
+    "machine",
+    [
+        [Processor(3e9, 16384)] * 4,
+        ## a queued process may not fit the vacated processor, so the event loop is used
+        [Processor(3e9, 16384)] * 3 + [Processor(3e9, 4096)],
+    ],
+    ids=["single", "single-mixed-memory"],
+)
+def testRunMatchesDetachOnOneClockSpeed(seed, machine):
+    assertRunMatchesDetach(generateProcesses(400, seed=seed), machine=machine)
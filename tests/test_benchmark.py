@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+import cli
+from batch_engine import Workload
+from benchmark import benchmarkPolicies, sortProcesses, sortWorkload
+from scheduler import Process
+
+
+def testShortestJobFirstBeatsFirstComeFirstServedTurnaround():
+    report = benchmarkPolicies(processes=200)
+    assert (
+        report["sjf"]["turnaround_time"]["mean"]
+        < report["fcfs"]["turnaround_time"]["mean"]
+    )
+
+
+BURST_TIMES = {
+    "sorted": [10, 20, 20, 30, 40, 40, 50],
+    "reversed": [50, 40, 40, 30, 20, 20, 10],
+    "equal": [30] * 7,
+}
+
+
+@pytest.mark.parametrize("order", sorted(BURST_TIMES))
+def testSortsAreStableByBurstTime(order):
+    burstTimes = BURST_TIMES[order]
+    PIDs = list(range(1, len(burstTimes) + 1))
+    ## processes with the same burst time keep their order, so PID breaks ties
+    expected = sorted(zip(burstTimes, PIDs))
+
+    processes = [
+        Process(PID, burstTime, burstTime, 100, -1, -1)
+        for PID, burstTime in zip(PIDs, burstTimes)
+    ]
+    assert sortProcesses(processes) is processes
+    assert [(process.burst_time, process.PID) for process in processes] == expected
+
+    workload = sortWorkload(Workload(PIDs, burstTimes, [100] * len(PIDs)))
+    assert list(zip(workload.burst_time.tolist(), workload.PID.tolist())) == expected
+
+
+def testSortProcessesOnlySortsTheGivenRange():
+    processes = [
+        Process(PID, burstTime, burstTime, 100, -1, -1)
+        for PID, burstTime in enumerate([50, 40, 30, 20, 10], 1)
+    ]
+    sortProcesses(processes, 1, 3)
+    assert [process.PID for process in processes] == [1, 4, 3, 2, 5]
+
+
+@pytest.mark.parametrize("batch", [False, True], ids=["scheduler", "batch"])
+def testShortestFirstSimulationLowersTurnaround(batch, capsys):
+    arguments = ["simulate", "--processes", "200", "--seed", "1"]
+    if batch:
+        arguments.append("--batch")
+    cli.main(arguments)
+    fifo = json.loads(capsys.readouterr().out)
+    cli.main(arguments + ["--shortest-first"])
+    shortestFirst = json.loads(capsys.readouterr().out)
+
+    assert shortestFirst["completed"] == fifo["completed"] == 200
+    ## every process is submitted at 0, so it completes after its wait and its run, and
+    ## running the short ones first cuts the mean of the two
+    assert (
+        shortestFirst["wait_time"]["mean"] + shortestFirst["turnaround_time"]["mean"]
+        < fifo["wait_time"]["mean"] + fifo["turnaround_time"]["mean"]
+    )
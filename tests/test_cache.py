@@ -0,0 +1,86 @@
+import os
+
+import numpy as np
+import pytest
+
+from batch_engine import simulate
+from cache import RESULT_COLUMNS, ResultCache, resultKey
+from process_generator import generateProcesses
+from scheduler import DEFAULT_MACHINE, Processor
+
+
+def testMemoryTierEvictsLeastRecentlyUsed():
+    workload = generateProcesses(10, seed=1)
+    cache = ResultCache(memory_entries=2)
+    cache.put("a", workload, 1.0)
+    cache.put("b", workload, 2.0)
+    ## looking "a" up makes "b" the least recently used
+    assert cache.get("a")[1] == 1.0
+    cache.put("c", workload, 3.0)
+
+    assert list(cache.entries) == ["a", "c"]
+    assert cache.get("b") == None
+    assert cache.get("c")[1] == 3.0
+    assert (cache.hits, cache.misses) == (2, 1)
+
+
+def testDiskTierEvictsLeastRecentlyUsed(tmp_path):
+    workload = generateProcesses(10, seed=1)
+    cache = ResultCache(str(tmp_path), memory_entries=0)
+    cache.put("a", workload, 1.0)
+    cache.disk_bytes = 2 * os.path.getsize(cache.path("a"))
+    cache.put("b", workload, 2.0)
+    os.utime(cache.path("a"), (1, 1))
+    os.utime(cache.path("b"), (2, 2))
+    ## reading "a" marks it as recently used, so "b" goes when "c" is written
+    assert cache.get("a")[1] == 1.0
+    cache.put("c", workload, 3.0)
+
+    assert sorted(os.listdir(str(tmp_path))) == ["a.npz", "c.npz"]
+    assert cache.get("b") == None
+
+
+def testDiskTierRoundTrip(tmp_path):
+    workload = generateProcesses(200, seed=4)
+    expected, clock = simulate(workload, DEFAULT_MACHINE)
+    key = resultKey(workload, DEFAULT_MACHINE)
+    ResultCache(str(tmp_path)).put(key, expected, clock)
+    assert os.path.exists(os.path.join(str(tmp_path), key + ".npz"))
+
+    ## a new cache has nothing in memory, so the result comes from disk
+    cache = ResultCache(str(tmp_path))
+    result, cachedClock = cache.simulate(workload, DEFAULT_MACHINE)
+
+    assert (cache.disk_hits, cache.misses) == (1, 0)
+    assert cachedClock == clock
+    for column in RESULT_COLUMNS:
+        assert np.array_equal(getattr(result, column), getattr(expected, column))
+    ## callers get their own copy
+    result.completion_time[:] = -1
+    assert np.array_equal(cache.get(key)[0].completion_time, expected.completion_time)
+
+
+@pytest.mark.parametrize(
+    "change",
+    [
+        {"machine": [Processor(2e9, 8192)]},
+        {"process_interval": 10**11},
+        {"clock": 1.0},
+        {"placement": "best"},
+    ],
+    ids=["machine", "process_interval", "clock", "placement"],
+)
+def testChangedConfigMisses(change):
+    workload = generateProcesses(100, seed=2)
+    cache = ResultCache()
+    cache.simulate(workload, DEFAULT_MACHINE)
+    config = {"machine": DEFAULT_MACHINE}
+    config.update(change)
+    machine = config.pop("machine")
+    cache.simulate(workload, machine, **config)
+
+    assert (cache.hits, cache.misses) == (0, 2)
+    assert len(cache) == 2
+    ## the first config is still cached
+    cache.simulate(workload, DEFAULT_MACHINE)
+    assert cache.hits == 1
@@ -0,0 +1,52 @@
+import pytest
+
+from checkpoint import forkScheduler
+from process_generator import generateProcesses
+from scheduler import Scheduler
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("process_interval", [0, 10**11])
+def testForkMatchesStraightRun(seed, process_interval):
+    processes = generateProcesses(300, seed=seed).toProcesses()
+    scheduler = Scheduler(process_interval)
+    scheduler.loadProcesses(processes)
+    for _ in range(100):
+        scheduler.detachProcess()
+    pending = {process.PID for process in processes if process.completion_time == -1}
+
+    fork = forkScheduler(scheduler)
+    forked = {}
+    endingProcess = fork.detachProcess()
+    while endingProcess != None:
+        if endingProcess.completion_time != -1:
+            forked[endingProcess.PID] = endingProcess
+        endingProcess = fork.detachProcess()
+    while scheduler.detachProcess() != None:
+        pass
+
+    assert fork.clock == scheduler.clock
+    assert set(forked) == pending
+    for process in processes:
+        if process.PID in forked:
+            assert forked[process.PID].arrival_time == process.arrival_time
+            assert forked[process.PID].completion_time == process.completion_time
+
+
+def testForkContinuesCoalescedRuns():
+    processes = generateProcesses(40, seed=2).toProcesses()
+    scheduler = Scheduler(10**11)
+    scheduler.loadProcesses(processes)
+    ## until a process runs its remaining intervals as one run
+    while scheduler.process_queue or not any(scheduler.run_cycles):
+        scheduler.detachProcess()
+
+    fork = forkScheduler(scheduler)
+    fork.loadProcesses(generateProcesses(10, seed=9).toProcesses())
+    scheduler.loadProcesses(generateProcesses(10, seed=9).toProcesses())
+    while scheduler.detachProcess() != None:
+        pass
+    while fork.detachProcess() != None:
+        pass
+
+    assert fork.clock == scheduler.clock
@@ -0,0 +1,84 @@
+import pytest
+
+from cluster import Cluster, PowerOfTwoBalancer, makeFleet
+from process_generator import generateProcesses
+from scheduler import Process, Processor, Scheduler
+
+
+# ----------------------------------------------------------------------------
+#    makeArrivals - seeded (timestamp, Process) pairs arriving every interval
+# ----------------------------------------------------------------------------
+
+
+def makeArrivals(count, interval, seed):
+    return [
+        (index * interval, process)
+        for index, process in enumerate(
+            generateProcesses(count, seed=seed).toProcesses()
+        )
+    ]
+
+
+@pytest.mark.parametrize(
+    "machine",
+    [None, [Processor(2e9, 8192), Processor(4e9, 16384)]],
+    ids=["default", "mixed"],
+)
+@pytest.mark.parametrize("epoch", [1e-8, 3e-10])
+def testOneNodeClusterMatchesStreamingScheduler(machine, epoch):
+    fleet = makeFleet(1) if machine == None else makeFleet(1, machine)
+    streamed = makeArrivals(2000, 2e-10, seed=4)
+    scheduler = Scheduler(machine=fleet[0], arrivals=streamed)
+    while scheduler.detachProcess() != None:
+        pass
+
+    arrivals = makeArrivals(2000, 2e-10, seed=4)
+    rows = {id(process): row for row, (timestamp, process) in enumerate(arrivals)}
+    with Cluster(fleet, epoch) as cluster:
+        completed = list(cluster.run(arrivals))
+
+    assert len(completed) == len(arrivals)
+    for node, process in completed:
+        assert process.completion_time == streamed[rows[id(process)]][1].completion_time
+
+
+# ----------------------------------------------------------------------------
+#    makeBursts - (timestamp, Process) pairs arriving in bursts, numbered by explicit PIDs
+#                 so two calls give equal processes
+# ----------------------------------------------------------------------------
+
+
+def makeBursts(count, burst, interval, seed):
+    workload = generateProcesses(count, seed=seed)
+    return [
+        (
+            (index // burst) * interval,
+            Process(index + 1, burstTime, burstTime, memory, -1, -1),
+        )
+        for index, (burstTime, memory) in enumerate(
+            zip(workload.burst_time.tolist(), workload.memory_footprint.tolist())
+        )
+    ]
+
+
+def testWorkersMatchInProcessNodes():
+    results = []
+    for workers in (0, 2):
+        with Cluster(
+            makeFleet(5),
+            1e-9,
+            balancer=PowerOfTwoBalancer(seed=1),
+            stealing=True,
+            workers=workers,
+        ) as cluster:
+            completed = [
+                (node, process.PID, process.arrival_time, process.completion_time)
+                for node, process in cluster.run(makeBursts(1500, 300, 2e-8, seed=9))
+            ]
+            results.append((sorted(completed), cluster.steals))
+
+    (expected, expectedSteals), (completed, steals) = results
+    assert len(completed) == 1500
+    assert expectedSteals > 0
+    assert completed == expected
+    assert steals == expectedSteals
@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from metrics import LatencyStats, P2Quantile, observeScheduler
+from process_generator import generateProcesses
+from scheduler import Process, Processor, Scheduler
+
+
+@pytest.mark.parametrize("count", [1, 2, 5, 50, 1000])
+def testSmallSamplesAreExact(count):
+    values = np.random.default_rng(count).lognormal(0, 1.5, count)
+    stats = LatencyStats()
+    for value in values.tolist():
+        stats.add(value)
+    summary = stats.summary()
+
+    expected = np.percentile(values, [50, 95, 99])
+    assert [summary["p50"], summary["p95"], summary["p99"]] == pytest.approx(
+        expected.tolist()
+    )
+
+
+def testSummaryQuantilesNeverDecrease():
+    values = np.random.default_rng(7).lognormal(0, 2, 20000)
+    stats = LatencyStats((0.5, 0.9, 0.95, 0.99, 0.999))
+    for value in values.tolist():
+        stats.add(value)
+    summary = stats.summary()
+
+    percentiles = [summary[key] for key in ("p50", "p90", "p95", "p99", "p99.9", "max")]
+    assert percentiles == sorted(percentiles)
+    assert summary["p50"] >= values.min()
+
+
+def testEstimateFollowsLargeStreams():
+    values = np.random.default_rng(11).random(50000)
+    estimate = P2Quantile(0.95, exact=100)
+    for value in values.tolist():
+        estimate.add(value)
+
+    assert estimate.value() == pytest.approx(np.percentile(values, 95), abs=0.01)
+
+
+@pytest.mark.parametrize("process_interval", [0, 10**11])
+def testObservedSchedulerRecordsEveryCompletion(process_interval):
+    processes = generateProcesses(200, seed=5).toProcesses()
+    scheduler = Scheduler(process_interval)
+    metrics = observeScheduler(scheduler, window=1.0)
+    scheduler.loadProcesses(processes)
+    while scheduler.detachProcess() != None:
+        pass
+
+    turnaround = [
+        process.completion_time - process.arrival_time for process in processes
+    ]
+    assert metrics.turnaround.stats.count == len(processes)
+    assert metrics.turnaround.stats.mean == pytest.approx(np.mean(turnaround))
+    assert metrics.summary(scheduler)["completed"] == len(processes)
+    assert metrics.wait.stats.count == len(processes)
+    ## the window is longer than the whole run
+    assert metrics.utilization(scheduler) == pytest.approx(
+        metrics.instrumentation.utilization(scheduler)
+    )
+    assert max(metrics.utilization(scheduler)) > 0.5
+
+
+def testStreamedProcessWaitsFromItsArrival():
+    first = Process(1, 10**9, 10**9, 100, -1, -1)
+    streamed = Process(2, 10**9, 10**9, 100, -1, -1)
+    scheduler = Scheduler(
+        machine=[Processor(1e9, 8192)], arrivals=[(0, first), (7e-7, streamed)]
+    )
+    metrics = observeScheduler(scheduler, window=1.0)
+    while scheduler.detachProcess() != None:
+        pass
+
+    ## the processor is vacant when it arrives, so it starts straight away
+    assert streamed.arrival_time == 7e-7
+    assert metrics.wait.stats.count == 2
+    assert metrics.wait.stats.maximum == 0
+
+
+def testProcessesSubmittedBeforeObservingHaveNoWait():
+    processes = generateProcesses(20, seed=1).toProcesses()
+    scheduler = Scheduler()
+    scheduler.loadProcesses(processes)
+    metrics = observeScheduler(scheduler, window=1.0)
+    while scheduler.detachProcess() != None:
+        pass
+
+    assert metrics.turnaround.stats.count == len(processes)
+    assert metrics.wait.stats.count == 0
+
+
+def testUtilizationCoversTheLastWindow():
+    first = Process(1, 10**9, 10**9, 100, -1, -1)
+    streamed = Process(2, 10**9, 10**9, 100, -1, -1)
+    scheduler = Scheduler(
+        machine=[Processor(1e9, 8192)], arrivals=[(0, first), (1e-8, streamed)]
+    )
+    metrics = observeScheduler(scheduler, window=2e-9)
+    while scheduler.detachProcess() != None:
+        pass
+
+    assert scheduler.clock == pytest.approx(1.1e-8)
+    ## busy for 1e-9 of the last 2e-9, less up to a bucket of window
+    assert metrics.utilization(scheduler) == pytest.approx([0.5], abs=0.02)
+    assert metrics.instrumentation.utilization(scheduler) == pytest.approx([2 / 11])
@@ -0,0 +1,130 @@
+import pytest
+
+from policies import (
+    MLFQPolicy,
+    PolicyScheduler,
+    RoundRobinPolicy,
+    SJFPolicy,
+    SRTFPolicy,
+)
+from process_generator import generateProcesses
+from scheduler import Process, Processor
+
+MACHINE = [Processor(2e9, 16384), Processor(4e9, 16384)]
+## one processor at 1 GHz, so 10**9 cycles take one second
+SINGLE = [Processor(1e9, 8192)]
+
+
+# ----------------------------------------------------------------------------
+#    complete - runs a policy over seeded arrivals until every process completes
+#
+#
+#    @returns - processes : list, scheduler : PolicyScheduler
+# ----------------------------------------------------------------------------
+
+
+def complete(policy, count=60, interval=5.0, seed=6):
+    processes = generateProcesses(count, seed=seed).toProcesses()
+    scheduler = PolicyScheduler(
+        policy,
+        machine=MACHINE,
+        arrivals=[
+            (index * interval, process) for index, process in enumerate(processes)
+        ],
+    )
+    while scheduler.detachProcess() != None:
+        pass
+    return processes, scheduler
+
+
+@pytest.mark.parametrize("cycles", [False, True], ids=["seconds", "cycles"])
+def testCoalescedRoundRobinMatchesEveryQuantum(cycles):
+    quantum = 4e9 if cycles else 1.0
+    processes, scheduler = complete(RoundRobinPolicy(quantum, cycles))
+    everyQuantum = RoundRobinPolicy(quantum, cycles)
+    everyQuantum.coalesce = False
+    expected, expectedScheduler = complete(everyQuantum)
+
+    assert [process.completion_time for process in processes] == pytest.approx(
+        [process.completion_time for process in expected], rel=1e-9
+    )
+    assert [process.arrival_time for process in processes] == pytest.approx(
+        [process.arrival_time for process in expected], rel=1e-9
+    )
+    assert scheduler.event_count < expectedScheduler.event_count
+
+
+# ----------------------------------------------------------------------------
+#    detachAll - runs a scheduler until every process completes
+#
+#
+#    @returns - (PID, completion time) of each process in order of completion : list
+# ----------------------------------------------------------------------------
+
+
+def detachAll(scheduler):
+    completed = []
+    endingProcess = scheduler.detachProcess()
+    while endingProcess != None:
+        completed.append((endingProcess.PID, endingProcess.completion_time))
+        endingProcess = scheduler.detachProcess()
+    return completed
+
+
+# ----------------------------------------------------------------------------
+#    makeProcess - returns a new process of the given cycles
+# ----------------------------------------------------------------------------
+
+
+def makeProcess(PID, cycles):
+    return Process(PID, cycles, cycles, 100, -1, -1)
+
+
+@pytest.mark.parametrize("policy", [SJFPolicy, SRTFPolicy], ids=["sjf", "srtf"])
+def testShorterArrivalPreemptsOnlyUnderSRTF(policy):
+    long = makeProcess(1, 10 * 10**9)
+    arrivals = [(0, long), (1.0, makeProcess(2, 2 * 10**9))]
+    ## arrives with more remaining cycles than the running process has left
+    arrivals.append((1.5, makeProcess(3, 5 * 10**9)))
+    scheduler = PolicyScheduler(policy(), machine=SINGLE, arrivals=arrivals)
+    completed = detachAll(scheduler)
+
+    if policy == SJFPolicy:
+        assert completed == pytest.approx([(1, 10.0), (2, 12.0), (3, 17.0)])
+    else:
+        assert completed == pytest.approx([(2, 3.0), (3, 8.0), (1, 17.0)])
+    assert long.remaining_cycles == 0
+
+
+@pytest.mark.parametrize("quantum, cycles", [(1.0, False), (10**9, True)])
+def testRoundRobinTakesTurnsByQuantum(quantum, cycles):
+    processes = [makeProcess(1, 3 * 10**9), makeProcess(2, 10**9)]
+    processes.append(makeProcess(3, 2 * 10**9))
+    scheduler = PolicyScheduler(
+        RoundRobinPolicy(quantum, cycles), processes, machine=SINGLE
+    )
+    completed = detachAll(scheduler)
+
+    ## slices run 1, 2, 3, 1, 3, 1 one second each
+    assert completed == pytest.approx([(2, 2.0), (3, 5.0), (1, 6.0)])
+    assert [process.arrival_time for process in processes] == [0, 1.0, 2.0]
+    assert scheduler.event_count == 6
+
+
+def testMLFQDemotesProcessThatUsesItsQuantum():
+    policy = MLFQPolicy((1.0, 2.0, None))
+    long = makeProcess(1, 5 * 10**9)
+    short = makeProcess(2, 10**9 // 2)
+    scheduler = PolicyScheduler(
+        policy, machine=SINGLE, arrivals=[(0, long), (1.5, short)]
+    )
+
+    ## it ran 0 - 1 in the top level and 1 - 3 in the next, so the new process waits
+    assert scheduler.detachProcess() is short
+    assert short.completion_time == pytest.approx(3.5)
+    assert long.remaining_cycles == 2 * 10**9
+    ## its second quantum ran out too, so it's in the last level
+    assert policy.running[id(long)] == 2
+    assert scheduler.detachProcess() is long
+    assert long.completion_time == pytest.approx(5.5)
+    assert scheduler.detachProcess() == None
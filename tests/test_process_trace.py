@@ -0,0 +1,29 @@
+import numpy as np
+import pytest
+
+from process_generator import generateProcesses
+from process_trace import readTrace, traceWorkload, writeTrace
+from scheduler import Scheduler
+
+
+def testTraceWorkloadRunsWithoutCopyingMappedColumns(tmp_path):
+    path = str(tmp_path / "jobs.trace")
+    workload = generateProcesses(500, seed=1)
+    writeTrace(path, workload)
+    records = readTrace(path)
+
+    result = Scheduler().run(traceWorkload(records))
+    assert np.shares_memory(result.PID, records)
+    assert np.shares_memory(result.memory_footprint, records)
+    assert (
+        result.completion_time.tolist()
+        == Scheduler().run(workload).completion_time.tolist()
+    )
+
+
+def testTraceWorkloadRejectsArrivalTimestamps(tmp_path):
+    path = str(tmp_path / "arrivals.trace")
+    workload = generateProcesses(10, seed=1)
+    writeTrace(path, workload, np.arange(len(workload), dtype=float))
+    with pytest.raises(ValueError):
+        traceWorkload(readTrace(path))
@@ -0,0 +1,75 @@
+from ready_queue import PriorityReadyQueue, memoryFootprintPriority
+from scheduler import Process, Processor, Scheduler
+
+## (PID, burst time, memory footprint) of processes in the order they're pushed
+PROCESSES = [(1, 30, 400), (2, 10, 500), (3, 20, 100), (4, 10, 300), (5, 30, 200)]
+
+
+# ----------------------------------------------------------------------------
+#    popAll - pops every process off a queue
+#
+#
+#    @returns - PIDs in the order they were popped : list
+# ----------------------------------------------------------------------------
+
+
+def popAll(queue):
+    PIDs = []
+    while queue:
+        PIDs.append(queue.pop().PID)
+    return PIDs
+
+
+# ----------------------------------------------------------------------------
+#    makeProcesses - returns new processes described by PROCESSES
+# ----------------------------------------------------------------------------
+
+
+def makeProcesses():
+    return [
+        Process(PID, burstTime, burstTime, memory, -1, -1)
+        for PID, burstTime, memory in PROCESSES
+    ]
+
+
+def testPopsShortestFirstAndTiesInArrivalOrder():
+    queue = PriorityReadyQueue(processes=makeProcesses())
+
+    assert len(queue) == 5
+    assert queue.peek().PID == 2
+    assert [process.PID for process in queue] == [2, 4, 3, 1, 5]
+    assert popAll(queue) == [2, 4, 3, 1, 5]
+
+
+def testTiesStayFirstComeFirstServedAcrossPops():
+    queue = PriorityReadyQueue()
+    first, second, third = [Process(PID, 10, 10, 100, -1, -1) for PID in (1, 2, 3)]
+    queue.push(first)
+    queue.push(second)
+    assert queue.pop() is first
+    ## a process pushed later queues behind the one already waiting
+    queue.push(third)
+    queue.push(first)
+
+    assert popAll(queue) == [2, 3, 1]
+
+
+def testCustomPriority():
+    queue = PriorityReadyQueue(memoryFootprintPriority, makeProcesses())
+
+    assert popAll(queue) == [3, 5, 4, 1, 2]
+
+
+def testSchedulerRunsShortestWaitingProcessFirst():
+    scheduler = Scheduler(
+        machine=[Processor(1e9, 8192)], process_queue=PriorityReadyQueue()
+    )
+    scheduler.loadProcesses(makeProcesses())
+    completed = []
+    endingProcess = scheduler.detachProcess()
+    while endingProcess != None:
+        completed.append(endingProcess.PID)
+        endingProcess = scheduler.detachProcess()
+
+    ## the first process takes the vacant processor before the rest are queued
+    assert completed == [1, 2, 4, 3, 5]
@@ -0,0 +1,39 @@
+import asyncio
+
+import pytest
+
+from realtime import RealTimeScheduler
+from scheduler import Process, Processor, Scheduler
+
+
+def testJoinStopsWaitingForCancelledProcess():
+    async def main():
+        dispatcher = RealTimeScheduler()
+        short = dispatcher.submit(Process(1, 10**8, 10**8, 100, -1, -1))
+        long = dispatcher.submit(Process(2, 10**12, 10**12, 100, -1, -1))
+        ## 0.05 simulated seconds for the short one at 2 GHz
+        await asyncio.sleep(0.01)
+        assert len(dispatcher.futures) == 2
+        long.cancel()
+        await asyncio.wait_for(dispatcher.join(), 5)
+        assert short.done() and not short.cancelled()
+        assert not dispatcher.futures
+        dispatcher.close()
+
+    asyncio.run(main())
+
+
+def testScaleIsSimulatedSecondsPerSecond():
+    async def main():
+        dispatcher = RealTimeScheduler(Scheduler(machine=[Processor(2e9, 8192)]), 1e4)
+        loop = asyncio.get_running_loop()
+        start = loop.time()
+        ## 500 simulated seconds, 0.05 seconds of wall-clock time at this scale
+        process = await dispatcher.submit(Process(1, 10**12, 10**12, 100, -1, -1))
+        elapsed = loop.time() - start
+        dispatcher.close()
+        return process, elapsed
+
+    process, elapsed = asyncio.run(main())
+    assert 0.05 <= elapsed < 2
+    assert (process.completion_time - process.arrival_time) * 2e9 == pytest.approx(500)
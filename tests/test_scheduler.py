@@ -0,0 +1,293 @@
+import pytest
+
+from process_generator import generateProcesses
+from scheduler import DEFAULT_MACHINE, Process, Processor, ProcessorPool, Scheduler
+
+
+# ----------------------------------------------------------------------------
+#    drain - loads processes into a new scheduler and calls detachProcess until it returns
+#            "None"
+#
+#
+#    @returns - scheduler : Scheduler
+# ----------------------------------------------------------------------------
+
+
+def drain(processes, process_interval=0, machine=DEFAULT_MACHINE, placement="first"):
+    scheduler = Scheduler(process_interval, machine=machine, placement=placement)
+    scheduler.loadProcesses(processes)
+    while scheduler.detachProcess() != None:
+        pass
+    return scheduler
+
+
+def testEveryRunningProcessProgressesUntilADetach():
+    first = Process(1, 4 * 10**9, 4 * 10**9, 100, -1, -1)
+    ending = Process(2, 10**9, 10**9, 100, -1, -1)
+    later = Process(3, 2 * 10**9, 2 * 10**9, 100, -1, -1)
+    fast = Process(4, 4 * 10**9, 4 * 10**9, 100, -1, -1)
+    machine = [Processor(2e9, 8192)] * 3 + [Processor(4e9, 16384)]
+    drain([first, ending, later, fast], machine=machine)
+
+    ## 2.5e-10 for the 1e9 cycles of the first process to detach
+    assert ending.completion_time == 2.5e-10
+    ## processors after the ending one progress by the whole 2.5e-10 as well
+    assert later.completion_time == 5e-10
+    ## its 4 GHz class clock runs twice as fast, so it finishes at the same detach
+    assert fast.completion_time == 2.5e-10
+    assert first.completion_time == 1e-9
+
+
+def testProcessIntervalRunsLongProcessToCompletion():
+    process = Process(1, 5 * 10**9, 5 * 10**9, 100, -1, -1)
+    detaches = 0
+    scheduler = Scheduler(10**9, machine=[Processor(2e9, 8192)])
+    scheduler.attachProcess(process)
+    while scheduler.detachProcess() != None:
+        detaches = detaches + 1
+
+    ## nothing else is waiting, so its five intervals are one run
+    assert detaches == 1
+    assert not scheduler.process_queue
+    assert process.burst_time == 5 * 10**9
+    assert process.remaining_cycles == 0
+    assert process.completion_time == pytest.approx(5e9 / 2e9 / 2e9)
+
+
+def testArrivalSplitsCoalescedRunAtItsInterval():
+    long = Process(1, 5 * 10**9, 5 * 10**9, 100, -1, -1)
+    short = Process(2, 10**9, 10**9, 100, -1, -1)
+    scheduler = Scheduler(
+        10**9, machine=[Processor(1e9, 8192)], arrivals=[(2.5e-9, short)]
+    )
+    scheduler.attachProcess(long)
+    detached = []
+    endingProcess = scheduler.detachProcess()
+    while endingProcess != None:
+        detached.append((endingProcess.PID, scheduler.clock))
+        endingProcess = scheduler.detachProcess()
+
+    ## the run is cut at the end of its third interval, after the arrival
+    assert [PID for PID, clock in detached] == [1, 2, 1]
+    assert [clock for PID, clock in detached] == pytest.approx([3e-9, 4e-9, 6e-9])
+    assert long.completion_time == pytest.approx(6e-9)
+    assert short.arrival_time == pytest.approx(3e-9)
+
+
+def testRequeuedProcessKeepsWholeCycles():
+    first = Process(1, 5 * 10**9, 5 * 10**9, 100, -1, -1)
+    second = Process(2, 3 * 10**9, 3 * 10**9, 100, -1, -1)
+    scheduler = Scheduler(10**9, machine=[Processor(3e9, 8192)])
+    scheduler.loadProcesses([first, second])
+
+    assert scheduler.detachProcess() is first
+    assert first.remaining_cycles == 4 * 10**9
+    assert type(first.remaining_cycles) == int
+    assert list(scheduler.process_queue) == [first]
+    ## the second process runs its first interval, the rest stays with it
+    assert second.remaining_cycles == 2 * 10**9
+
+
+@pytest.mark.parametrize("process_interval", [10**11, 10**12, 3 * 10**11])
+def testProcessIntervalCompletesEveryProcess(process_interval):
+    workload = generateProcesses(80, seed=3)
+    processes = workload.toProcesses()
+    scheduler = drain(processes, process_interval)
+
+    assert not scheduler.process_queue
+    assert all(process == None for process in scheduler.pool.current_processes)
+    for process, burstTime in zip(processes, workload.burst_time.tolist()):
+        assert process.burst_time == burstTime
+        assert process.remaining_cycles == 0
+        assert process.completion_time >= process.arrival_time >= 0
+
+
+MACHINES = {
+    "default": DEFAULT_MACHINE,
+    "mixed": [Processor(2e9, 8192), Processor(4e9, 16384)],
+    "single": [Processor(3e9, 16384)] * 4,
+}
+
+
+# ----------------------------------------------------------------------------
+#    loadedScheduler - loads processes into a new scheduler and detaches some of them, so
+#                      it's left mid run
+# ----------------------------------------------------------------------------
+
+
+def loadedScheduler(processes, machine, detaches):
+    scheduler = Scheduler(machine=machine)
+    scheduler.loadProcesses(processes)
+    for _ in range(detaches):
+        scheduler.detachProcess()
+    return scheduler
+
+
+def testFastForwardMatchesDetachOnMixedSpeeds():
+    machine = MACHINES["mixed"]
+    detached = [Process(1, 2e9, 2e9, 100, -1, -1), Process(2, 6e9, 6e9, 100, -1, -1)]
+    drain(detached, machine=machine)
+    processes = [Process(1, 2e9, 2e9, 100, -1, -1), Process(2, 6e9, 6e9, 100, -1, -1)]
+    scheduler = loadedScheduler(processes, machine, 0)
+    completed = scheduler.fastForward()
+
+    assert [process.PID for process in completed] == [1, 2]
+    assert [process.completion_time for process in processes] == [5e-10, 5e-10]
+    assert [process.completion_time for process in detached] == [5e-10, 5e-10]
+
+
+@pytest.mark.parametrize("machine", sorted(MACHINES))
+@pytest.mark.parametrize("seed", [17, 52, 3])
+@pytest.mark.parametrize("count", [300, 2500])
+def testFastForwardMatchesDetach(machine, seed, count):
+    workload = generateProcesses(count, seed=seed)
+    detached = workload.toProcesses()
+    expected = loadedScheduler(detached, MACHINES[machine], 40)
+    while expected.detachProcess() != None:
+        pass
+
+    processes = workload.toProcesses()
+    scheduler = loadedScheduler(processes, MACHINES[machine], 40)
+    completed = scheduler.fastForward()
+
+    assert len(completed) == count - 40
+    assert scheduler.clock == expected.clock
+    assert scheduler.class_clocks == expected.class_clocks
+    assert [process.arrival_time for process in processes] == [
+        process.arrival_time for process in detached
+    ]
+    assert [process.completion_time for process in processes] == [
+        process.completion_time for process in detached
+    ]
+
+
+@pytest.mark.parametrize("machine", sorted(MACHINES))
+def testFastForwardInstrumentsEveryDetach(machine):
+    workload = generateProcesses(2500, seed=8)
+    expected = Scheduler(machine=MACHINES[machine])
+    expectedInstrumentation = expected.instrument()
+    expected.loadProcesses(workload.toProcesses())
+    while expected.detachProcess() != None:
+        pass
+
+    events = []
+    scheduler = Scheduler(machine=MACHINES[machine])
+    instrumentation = scheduler.instrument(lambda *event: events.append(event[0]))
+    scheduler.loadProcesses(workload.toProcesses())
+    scheduler.fastForward()
+
+    assert instrumentation.utilization(
+        scheduler
+    ) == expectedInstrumentation.utilization(expected)
+    assert (
+        instrumentation.calls["detachProcess"]
+        == expectedInstrumentation.calls["detachProcess"]
+    )
+    assert events.count("complete") == 2500
+
+
+def testRemovedInstrumentationLetsFastForwardBatch():
+    workload = generateProcesses(2500, seed=8)
+    expected = Scheduler()
+    expected.loadProcesses(workload.toProcesses())
+    while expected.detachProcess() != None:
+        pass
+
+    events = []
+    scheduler = Scheduler()
+    instrumentation = scheduler.instrument(lambda *event: events.append(event[0]))
+    assert scheduler.instrumentation is instrumentation
+    scheduler.loadProcesses(workload.toProcesses())
+    instrumentation.remove(scheduler)
+    assert scheduler.instrumentation == None
+    completed = scheduler.fastForward()
+
+    assert len(completed) == 2500
+    assert scheduler.clock == expected.clock
+    ## only the attaches made while it was installed were seen
+    assert "detach" not in events
+    assert instrumentation.calls["detachProcess"] == 0
+
+
+POOL_MACHINE = [
+    Processor(2e9, 4096),
+    Processor(4e9, 16384),
+    Processor(2e9, 8192),
+    Processor(2e9, 2048),
+    Processor(4e9, 8192),
+]
+
+
+# ----------------------------------------------------------------------------
+#    assertTreeHolds - checks every node of the pool's segment tree holds the largest
+#                      memory of a vacant processor below it
+# ----------------------------------------------------------------------------
+
+
+def assertTreeHolds(pool):
+    for index, process in enumerate(pool.current_processes):
+        leaf = pool.free_memory[pool.leaves + pool.positions[index]]
+        assert leaf == (pool.memory[index] if process == None else -1)
+    for node in range(1, pool.leaves):
+        assert pool.free_memory[node] == max(
+            pool.free_memory[2 * node], pool.free_memory[2 * node + 1]
+        )
+
+
+def testPoolFindsAFreeProcessorByMemory():
+    pool = ProcessorPool(POOL_MACHINE)
+
+    assertTreeHolds(pool)
+    assert pool.findFreeProcessor(1000) == 0
+    assert pool.findFreeProcessor(5000) == 1
+    assert pool.findFreeProcessor(16384) == 1
+    assert pool.findFreeProcessor(16385) == -1
+
+
+def testOccupyingAndFreeingUpdatesTheTree():
+    pool = ProcessorPool(POOL_MACHINE)
+    process = Process(1, 10**9, 10**9, 10000, -1, -1)
+
+    pool.setProcess(1, process)
+    assertTreeHolds(pool)
+    assert pool.current_processes[1] is process
+    assert pool.free_memory[1] == 8192
+    assert pool.findFreeProcessor(10000) == -1
+    assert pool.findFreeProcessor(5000) == 2
+
+    pool.setProcess(1, None)
+    assertTreeHolds(pool)
+    assert pool.free_memory[1] == 16384
+    assert pool.findFreeProcessor(10000) == 1
+
+    for index in range(len(pool)):
+        pool.setProcess(index, process)
+    assertTreeHolds(pool)
+    assert pool.findFreeProcessor(1) == -1
+
+
+@pytest.mark.parametrize(
+    "placement, expected",
+    [
+        ("first", [0, 1, 1, 2]),
+        ("best", [3, 2, 1, 2]),
+        ("worst", [1, 1, 1, 2]),
+    ],
+)
+def testPlacementPicksTheRightProcessor(placement, expected):
+    pool = ProcessorPool(POOL_MACHINE, placement)
+    picked = [pool.findFreeProcessor(1000), pool.findFreeProcessor(5000)]
+    picked.append(pool.findFreeProcessor(10000))
+    ## with the large processor taken, ties between the two 8192 MB ones go to the lowest index
+    pool.setProcess(1, Process(1, 10**9, 10**9, 10000, -1, -1))
+    pool.setProcess(0, Process(2, 10**9, 10**9, 100, -1, -1))
+    pool.setProcess(3, Process(3, 10**9, 10**9, 100, -1, -1))
+    picked.append(pool.findFreeProcessor(5000))
+
+    assertTreeHolds(pool)
+    assert picked == expected
+
+
+def testUnknownPlacementIsRejected():
+    with pytest.raises(ValueError):
+        ProcessorPool(POOL_MACHINE, "next")
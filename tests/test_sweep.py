@@ -0,0 +1,79 @@
+import pytest
+
+from process_generator import generateProcesses
+from scheduler import Processor, Scheduler
+from sweep import (
+    SweepConfig,
+    SweepResult,
+    aggregateSweep,
+    makeSweep,
+    runSimulation,
+    runSweep,
+)
+
+MACHINES = {
+    "single": [Processor(1e9, 16384)],
+    "pair": [Processor(1e9, 16384), Processor(2e9, 16384)],
+}
+
+
+def testAggregateMergesSeedsOfTheSameConfig():
+    results = []
+    for config in makeSweep(MACHINES, [0, 10**9], [0, 1], processes=10):
+        ## made up totals that depend on the seed
+        scale = config.seed + 1
+        results.append(
+            SweepResult(config, 1, 10, 2.0 * scale, 0.5 * scale, 1.0 * scale, scale)
+        )
+    totals = aggregateSweep(results)
+
+    assert sorted(totals) == [
+        ("pair", 0),
+        ("pair", 10**9),
+        ("single", 0),
+        ("single", 10**9),
+    ]
+    for total in totals.values():
+        assert (total.runs, total.completed) == (2, 20)
+        assert (total.turnaround_sum, total.turnaround_max) == (6.0, 1.0)
+        assert (total.wait_sum, total.wait_max) == (3.0, 2)
+        assert total.averageTurnaround() == 0.3
+        assert total.averageWait() == 0.15
+
+
+def testSweepMatchesSerialSimulations():
+    configs = makeSweep(MACHINES, [0, 10**11], [3, 4], processes=40)
+    totals = aggregateSweep(runSweep(configs, max_workers=2))
+    expected = aggregateSweep(runSimulation(config) for config in configs)
+
+    assert len(configs) == 8
+    assert sorted(totals) == sorted(expected)
+    for key, total in totals.items():
+        assert total.runs == 2
+        assert total.completed == 80
+        assert total.turnaround_sum == pytest.approx(expected[key].turnaround_sum)
+        assert total.turnaround_max == expected[key].turnaround_max
+        assert total.wait_sum == pytest.approx(expected[key].wait_sum)
+        assert total.wait_max == expected[key].wait_max
+
+
+@pytest.mark.parametrize("process_interval", [0, 10**11])
+def testSimulationTotalsMatchTheScheduler(process_interval):
+    config = SweepConfig("pair", MACHINES["pair"], process_interval, 60, 5)
+    result = runSimulation(config)
+    processes = generateProcesses(60, seed=5).toProcesses()
+    scheduler = Scheduler(process_interval, machine=MACHINES["pair"])
+    scheduler.loadProcesses(processes)
+    while scheduler.detachProcess() != None:
+        pass
+
+    turnaround = [
+        process.completion_time - process.arrival_time for process in processes
+    ]
+    ## every process is submitted at 0, so it waits until its arrival
+    wait = [process.arrival_time for process in processes]
+    assert (result.runs, result.completed) == (1, 60)
+    assert result.turnaround_sum == pytest.approx(sum(turnaround))
+    assert result.turnaround_max == pytest.approx(max(turnaround))
+    assert result.wait_sum == pytest.approx(sum(wait))
+    assert result.wait_max == pytest.approx(max(wait))